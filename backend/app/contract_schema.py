@@ -5,6 +5,7 @@ Defines the comprehensive structure for contract information.
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
+from functools import lru_cache
 
 
 class PaymentSchedule(str, Enum):
@@ -56,6 +57,18 @@ def is_generic_name(name: str) -> bool:
     return name_lower in very_generic and " " not in name_lower
 
 
+def coerce_deliverable(deliverable: Any) -> Dict[str, Any]:
+    """Coerce a deliverable into the canonical {item, description, format, quantity} dict."""
+    if isinstance(deliverable, dict):
+        return deliverable
+    return {
+        "item": str(deliverable) if deliverable is not None else None,
+        "description": None,
+        "format": None,
+        "quantity": None,
+    }
+
+
 def get_empty_contract_spec() -> Dict[str, Any]:
     """Return an empty contract specification with all fields initialized."""
     return {
@@ -241,8 +254,9 @@ def calculate_missing_fields(spec: Dict[str, Any]) -> List[str]:
     return missing
 
 
+@lru_cache(maxsize=None)
 def get_field_question(field: str) -> str:
-    """Get a user-friendly question for a specific missing field."""
+    """Get a user-friendly question for a specific missing field (memoized - field metadata never changes)."""
     questions = {
         # Party names
         "freelancer_name": "What's your full legal name (or your business name if you're a company)?",
@@ -277,8 +291,9 @@ def get_field_question(field: str) -> str:
     return questions.get(field, f"Could you tell me more about {field.replace('_', ' ')}?")
 
 
+@lru_cache(maxsize=None)
 def get_field_priority(field: str) -> int:
-    """Get priority level for a field (lower = higher priority)."""
+    """Get priority level for a field (lower = higher priority, memoized)."""
     priorities = {
         "freelancer_name": 1,
         "client_name": 1,
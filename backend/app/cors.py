@@ -0,0 +1,86 @@
+"""
+Static CORS Middleware
+Plain ASGI CORS handling for a fixed origin list, with the headers built once.
+"""
+from typing import Iterable
+
+
+# Same method list Starlette's CORSMiddleware advertises for allow_methods=["*"]
+_ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+# Extra headers on normal responses to an allowed origin (plus the origin itself)
+_SIMPLE_HEADERS = ((b"access-control-allow-credentials", b"true"),)
+
+# Headers shared by every allowed preflight response
+_PREFLIGHT_HEADERS = (
+    (b"access-control-allow-methods", _ALLOW_METHODS),
+    (b"access-control-allow-credentials", b"true"),
+    (b"access-control-max-age", b"600"),
+    (b"vary", b"Origin, Access-Control-Request-Method, Access-Control-Request-Headers"),
+)
+
+_DISALLOWED_BODY = b"Disallowed CORS origin"
+_DISALLOWED_HEADERS = (
+    (b"content-type", b"text/plain; charset=utf-8"),
+    (b"content-length", str(len(_DISALLOWED_BODY)).encode("latin-1")),
+)
+
+
+class StaticCORSMiddleware:
+    """
+    Equivalent of CORSMiddleware(allow_credentials=True, allow_methods=["*"],
+    allow_headers=["*"]) for an exact-match origin list. Origins are compared
+    as raw header bytes against a frozenset, and preflights are answered with
+    an empty 204 without reaching the app.
+    """
+
+    def __init__(self, app, allow_origins: Iterable[str]):
+        self.app = app
+        self.origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is not None and scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(send, origin if origin in self.origins else None, request_headers)
+            return
+
+        # Responses differ per origin, so caches must always key on it
+        extra = [(b"access-control-allow-origin", origin), *_SIMPLE_HEADERS] if origin in self.origins else []
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                vary = [v for k, v in headers if k.lower() == b"vary"]
+                headers = [(k, v) for k, v in headers if k.lower() != b"vary"]
+                headers.extend(extra)
+                headers.append((b"vary", b", ".join(vary + [b"Origin"])))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    @staticmethod
+    async def _preflight(send, origin, request_headers):
+        if origin is None:
+            await send({"type": "http.response.start", "status": 400, "headers": list(_DISALLOWED_HEADERS)})
+            await send({"type": "http.response.body", "body": _DISALLOWED_BODY})
+            return
+
+        headers = [*_PREFLIGHT_HEADERS, (b"access-control-allow-origin", origin)]
+        if request_headers is not None:
+            # Every header is allowed, so echo back what was asked for
+            headers.append((b"access-control-allow-headers", request_headers))
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
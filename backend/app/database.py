@@ -3,10 +3,10 @@ SQLite Database for Contract Persistence
 Simple file-based storage for contract sessions.
 """
 import sqlite3
-import json
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
+from . import json_utils
 
 # Database file location
 DB_PATH = Path(__file__).parent.parent / "contracts.db"
@@ -63,7 +63,7 @@ def save_session(
         
         if contract_spec is not None:
             updates.append("contract_spec = ?")
-            params.append(json.dumps(contract_spec, default=str))
+            params.append(json_utils.dumps(contract_spec))
         
         if contract_text is not None:
             updates.append("contract_text = ?")
@@ -71,7 +71,7 @@ def save_session(
         
         if chat_history is not None:
             updates.append("chat_history = ?")
-            params.append(json.dumps(chat_history, default=str))
+            params.append(json_utils.dumps(chat_history))
         
         params.append(session_id)
         
@@ -88,9 +88,9 @@ def save_session(
             """,
             (
                 session_id,
-                json.dumps(contract_spec, default=str) if contract_spec else None,
+                json_utils.dumps(contract_spec) if contract_spec else None,
                 contract_text,
-                json.dumps(chat_history, default=str) if chat_history else "[]",
+                json_utils.dumps(chat_history) if chat_history else "[]",
                 now,
                 now
             )
@@ -114,9 +114,9 @@ def get_session(session_id: str) -> Optional[Dict[str, Any]]:
     
     return {
         "session_id": row["session_id"],
-        "contract_spec": json.loads(row["contract_spec"]) if row["contract_spec"] else None,
+        "contract_spec": json_utils.loads(row["contract_spec"]) if row["contract_spec"] else None,
         "contract_text": row["contract_text"],
-        "chat_history": json.loads(row["chat_history"]) if row["chat_history"] else [],
+        "chat_history": json_utils.loads(row["chat_history"]) if row["chat_history"] else [],
         "created_at": row["created_at"],
         "updated_at": row["updated_at"],
     }
@@ -142,7 +142,7 @@ def list_sessions(limit: int = 50) -> List[Dict[str, Any]]:
     
     sessions = []
     for row in rows:
-        spec = json.loads(row["contract_spec"]) if row["contract_spec"] else {}
+        spec = json_utils.loads(row["contract_spec"]) if row["contract_spec"] else {}
         sessions.append({
             "session_id": row["session_id"],
             "title": spec.get("title", "Untitled Contract"),
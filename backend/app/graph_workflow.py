@@ -10,8 +10,9 @@ Workflow:
 5. generate_contract - Create contract text
 6. explain_contract - Summarize in plain English
 """
+from functools import cache, lru_cache
 from typing import Dict, Any, Optional
-from .state_graph import StateGraph, GraphAgent
+from .state_graph import StateGraph, CompiledGraph, GraphAgent
 from .contract_schema import get_empty_contract_spec
 
 # Import all nodes
@@ -24,9 +25,10 @@ from .nodes.generate_contract_node import generate_contract_node
 from .nodes.explain_contract_node import explain_contract_node
 
 
-def create_unified_contract_agent() -> GraphAgent:
+def create_unified_contract_agent(debug: bool = False) -> GraphAgent:
     """
     Create a unified contract agent that handles both chat and blocks input.
+    Pass debug=True to record the visited node path in state["_visited_nodes"].
     
     Workflow:
     1. detect_input_type - Check if chat or blocks input
@@ -37,42 +39,8 @@ def create_unified_contract_agent() -> GraphAgent:
     5. generate_contract - Create the full contract text
     6. explain_contract - Summarize in plain English
     """
-    wf = StateGraph()
-    
-    # Add all nodes
-    wf.add_node("detect_input", detect_input_type_node)
-    wf.add_node("parse_chat", update_spec_from_message_node)
-    wf.add_node("parse_blocks", parse_blocks_node)
-    wf.add_node("normalize_spec", normalize_spec_node)
-    wf.add_node("validate_spec", validate_spec_node)
-    wf.add_node("generate_contract", generate_contract_node)
-    wf.add_node("explain_contract", explain_contract_node)
-    
-    # Set entry point
-    wf.set_entry_point("detect_input")
-    
-    # Route based on input type
-    wf.add_conditional_edges(
-        "detect_input",
-        route_by_input_type,
-        {
-            "CHAT": "parse_chat",
-            "BLOCKS": "parse_blocks",
-            "NONE": "validate_spec",  # Skip to validation which will fail
-        },
-    )
-    
-    # Both parse paths lead to normalize
-    wf.add_edge("parse_chat", "normalize_spec")
-    wf.add_edge("parse_blocks", "normalize_spec")
-    
-    # Normalize → Validate → Generate → Explain
-    wf.add_edge("normalize_spec", "validate_spec")
-    wf.add_edge("validate_spec", "generate_contract")
-    wf.add_edge("generate_contract", "explain_contract")
-    
-    # Compile the graph
-    compiled = wf.compile()
+    # Compiled graphs hold no per-run state, so agents share one
+    compiled = _compile_unified_graph(debug)
     
     # Initial state
     initial_state = {
@@ -112,39 +80,82 @@ def create_unified_contract_agent() -> GraphAgent:
     return agent
 
 
-async def run_from_chat(chat_input: str) -> Dict[str, Any]:
+@lru_cache(maxsize=None)
+def _compile_unified_graph(debug: bool) -> CompiledGraph:
+    """Build and compile the unified workflow graph (once per debug setting)."""
+    wf = StateGraph()
+    
+    # Add all nodes
+    wf.add_node("detect_input", detect_input_type_node)
+    wf.add_node("parse_chat", update_spec_from_message_node)
+    wf.add_node("parse_blocks", parse_blocks_node)
+    wf.add_node("normalize_spec", normalize_spec_node)
+    wf.add_node("validate_spec", validate_spec_node)
+    wf.add_node("generate_contract", generate_contract_node)
+    wf.add_node("explain_contract", explain_contract_node)
+    
+    # Set entry point
+    wf.set_entry_point("detect_input")
+    
+    # Route based on input type
+    wf.add_conditional_edges(
+        "detect_input",
+        route_by_input_type,
+        {
+            "CHAT": "parse_chat",
+            "BLOCKS": "parse_blocks",
+            "NONE": "validate_spec",  # Skip to validation which will fail
+        },
+    )
+    
+    # Both parse paths lead to normalize
+    wf.add_edge("parse_chat", "normalize_spec")
+    wf.add_edge("parse_blocks", "normalize_spec")
+    
+    # Normalize → Validate → Generate → Explain
+    wf.add_edge("normalize_spec", "validate_spec")
+    wf.add_edge("validate_spec", "generate_contract")
+    wf.add_edge("generate_contract", "explain_contract")
+    
+    # Compile the graph
+    return wf.compile(debug=debug)
+
+
+async def run_from_chat(chat_input: str, debug: bool = False) -> Dict[str, Any]:
     """
     Convenience function to run the agent with chat input.
     
     Args:
         chat_input: Natural language description of the contract
+        debug: Record the visited node path in the result
         
     Returns:
         Final state with contract_text, summary, validation, etc.
     """
-    agent = create_unified_contract_agent()
+    agent = create_unified_contract_agent(debug=debug)
     agent.state["chat_input"] = chat_input
     agent.state["input"] = chat_input  # For compatibility with update_spec_node
     
-    result = await agent.graph.run(agent.state)
-    return result
+    await agent.graph.run(agent.state)
+    return agent.state
 
 
-async def run_from_blocks(blocks_input: Dict[str, Any]) -> Dict[str, Any]:
+async def run_from_blocks(blocks_input: Dict[str, Any], debug: bool = False) -> Dict[str, Any]:
     """
     Convenience function to run the agent with blocks input.
     
     Args:
         blocks_input: Block graph JSON with nodes and edges
+        debug: Record the visited node path in the result
         
     Returns:
         Final state with contract_text, summary, validation, etc.
     """
-    agent = create_unified_contract_agent()
+    agent = create_unified_contract_agent(debug=debug)
     agent.state["blocks_input"] = blocks_input
     
-    result = await agent.graph.run(agent.state)
-    return result
+    await agent.graph.run(agent.state)
+    return agent.state
 
 
 # === CHAT-BASED INTERACTIVE AGENT ===
@@ -160,6 +171,42 @@ def create_chat_contract_agent() -> GraphAgent:
     
     This is the conversational workflow that asks follow-up questions.
     """
+    # Compiled graphs hold no per-run state, so agents share one
+    compiled = compile_chat_graph()
+    
+    # Initial state
+    initial_state = {
+        "input": None,
+        "contract_spec": get_empty_contract_spec(),
+        "missing_fields": None,
+        "next_action": None,
+        "assistant_message": None,
+        "contract_text": None,
+        "summary": None,
+        "questions_asked": 0,
+        "extraction_notes": None,
+        "decision_reason": None,
+        "current_question_field": None,
+        "normalization_notes": [],
+        "validation_result": None,
+        "is_valid": False,
+        "issues": [],
+        "warnings": [],
+    }
+    
+    agent = GraphAgent(
+        name="chat_contract_agent",
+        description="Interactive agent that gathers contract info through conversation.",
+        graph=compiled,
+        initial_state=initial_state,
+    )
+    
+    return agent
+
+
+@cache
+def compile_chat_graph() -> CompiledGraph:
+    """Build and compile the conversational workflow graph (once per process)."""
     wf = StateGraph()
     
     # Add all nodes
@@ -195,36 +242,7 @@ def create_chat_contract_agent() -> GraphAgent:
     # ask_question and explain_contract are terminal nodes
     
     # Compile
-    compiled = wf.compile()
-    
-    # Initial state
-    initial_state = {
-        "input": None,
-        "contract_spec": get_empty_contract_spec(),
-        "missing_fields": None,
-        "next_action": None,
-        "assistant_message": None,
-        "contract_text": None,
-        "summary": None,
-        "questions_asked": 0,
-        "extraction_notes": None,
-        "decision_reason": None,
-        "current_question_field": None,
-        "normalization_notes": [],
-        "validation_result": None,
-        "is_valid": False,
-        "issues": [],
-        "warnings": [],
-    }
-    
-    agent = GraphAgent(
-        name="chat_contract_agent",
-        description="Interactive agent that gathers contract info through conversation.",
-        graph=compiled,
-        initial_state=initial_state,
-    )
-    
-    return agent
+    return wf.compile()
 
 
 def get_opening_message() -> str:
@@ -0,0 +1,38 @@
+"""
+JSON Utilities
+Fast JSON encoding/decoding via orjson, falling back to the stdlib json module.
+"""
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+if orjson is not None:
+    # datetime/date, UUID, dataclass and Enum values serialize natively in C;
+    # only types orjson doesn't know reach the Python-level default hook
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _OPTIONS_INDENT = _OPTIONS | orjson.OPT_INDENT_2
+
+
+def dumps_bytes(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = str) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes (2-space indent when indent=True)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=_OPTIONS_INDENT if indent else _OPTIONS)
+    if indent:
+        return json.dumps(obj, indent=2, default=default, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=default, ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = str) -> str:
+    """Serialize obj to a JSON string (2-space indent when indent=True)."""
+    return dumps_bytes(obj, indent=indent, default=default).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON string or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
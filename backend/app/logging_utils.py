@@ -0,0 +1,52 @@
+"""
+Logging Utilities
+Application loggers whose records are written to stderr by a background thread.
+"""
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+# While the server runs, records are queued by the caller and formatted/written
+# by the listener thread, so a request handler never blocks on stderr. Until
+# start_logging() (scripts, tests without the lifespan) they are written
+# directly, so nothing piles up in a queue that no one reads.
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+_stream_handler = logging.StreamHandler(sys.stderr)
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+_queue_handler = QueueHandler(_queue)
+_listener = QueueListener(_queue, _stream_handler, respect_handler_level=True)
+_started = False
+
+_root = logging.getLogger("pebblepay")
+_root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+_root.addHandler(_stream_handler)
+_root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger under the "pebblepay" namespace."""
+    return _root.getChild(name)
+
+
+def start_logging() -> None:
+    """Start the background writer thread and route records through it (no-op if already running)."""
+    global _started
+    if not _started:
+        _listener.start()
+        _root.addHandler(_queue_handler)
+        _root.removeHandler(_stream_handler)
+        _started = True
+
+
+def stop_logging() -> None:
+    """Flush queued records, stop the writer thread and go back to direct writes."""
+    global _started
+    if _started:
+        _root.addHandler(_stream_handler)
+        _root.removeHandler(_queue_handler)
+        _listener.stop()
+        _started = False
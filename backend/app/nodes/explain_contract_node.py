@@ -2,8 +2,8 @@
 Explain Contract Node
 Generates a comprehensive plain-English summary highlighting key protections.
 """
-import json
 from typing import Dict, Any
+from .. import json_utils
 from ..llm import llm
 
 
@@ -41,7 +41,7 @@ async def explain_contract_node(state: Dict[str, Any]) -> Dict[str, Any]:
     prompt = f"""Create a friendly, comprehensive summary of this contract for the freelancer:
 
 Contract Specification:
-{json.dumps(contract_spec, indent=2, default=str)}
+{json_utils.dumps(contract_spec, indent=True)}
 
 Key Information:
 {key_info}
@@ -5,7 +5,7 @@ Ensures contract spec has consistent formatting, defaults, and structure.
 from typing import Dict, Any
 from datetime import datetime, timedelta
 import re
-from ..contract_schema import get_empty_contract_spec
+from ..contract_schema import get_empty_contract_spec, coerce_deliverable
 
 
 async def normalize_spec_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -63,8 +63,11 @@ def ensure_structure(spec: Dict[str, Any]) -> Dict[str, Any]:
             elif value is not None:
                 result[key] = value
         return result
-    
-    return deep_merge(template, spec)
+
+    merged = deep_merge(template, spec)
+    merged["deliverables"] = [coerce_deliverable(d) for d in merged.get("deliverables") or []]
+
+    return merged
 
 
 def normalize_dates(spec: Dict[str, Any]) -> tuple:
@@ -2,12 +2,14 @@
 Update Spec Node
 Extracts comprehensive contract details from user messages and updates the contract spec.
 """
-import json
+from types import MappingProxyType
 from typing import Dict, Any
+from .. import json_utils
 from ..llm import llm
 from ..contract_schema import (
     get_empty_contract_spec,
     calculate_missing_fields,
+    coerce_deliverable,
 )
 
 
@@ -68,8 +70,20 @@ The contract spec schema:
 - payment: {amount, currency, schedule, deposit_percentage, milestones}
 - timeline: {start_date, deadline, milestones}
 - quality_standards: {acceptance_criteria, revision_policy, max_revisions, approval_process}
-- failure_scenarios: {...}
-- dispute_resolution: {...}
+- failure_scenarios:
+    - late_delivery: {penalty_type, penalty_amount, grace_period_days}
+    - non_delivery: {refund_percentage, conditions}
+    - client_rejection: {process, refund_policy}
+    - freelancer_cancellation: {refund_policy, notice_period_days}
+    - client_cancellation: {refund_policy, kill_fee_percentage}
+- dispute_resolution: {method, location, process, governing_law}
+- liability: {max_liability, exclusions, insurance_required}
+- special_terms: [...]
+- ip_ownership: {final_work, transfer_on, portfolio_rights}
+- confidentiality: {required, duration, scope}
+
+The current spec only lists fields that already have values - always use
+the exact key names above for any field you fill in.
 
 Return JSON with:
 {
@@ -81,6 +95,18 @@ Return JSON with:
 Return ONLY valid JSON."""
 
 
+# Shared read-only fallback for missing sections
+_EMPTY = MappingProxyType({})
+
+# Hints for fields where the LLM tends to mix up freelancer and client
+_FIELD_HINTS: Dict[str, str] = {
+    "freelancer_name": "THE FIELD BEING ASKED: freelancer_name (the user's own name - they are the freelancer)",
+    "client_name": "THE FIELD BEING ASKED: client_name (the name of the person/business hiring them)",
+    "freelancer_email": "THE FIELD BEING ASKED: freelancer_email (the user's own email)",
+    "client_email": "THE FIELD BEING ASKED: client_email (the client's email)",
+}
+
+
 async def update_spec_from_message_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Reads: state["input"], state["contract_spec"] (may be None).
@@ -95,21 +121,15 @@ async def update_spec_from_message_node(state: Dict[str, Any]) -> Dict[str, Any]
     current_question_field = state.get("current_question_field", "")
     
     # Tell the LLM exactly which field we were asking about
-    field_hint = ""
-    if current_question_field:
-        if current_question_field == "freelancer_name":
-            field_hint = "THE FIELD BEING ASKED: freelancer_name (the user's own name - they are the freelancer)"
-        elif current_question_field == "client_name":
-            field_hint = "THE FIELD BEING ASKED: client_name (the name of the person/business hiring them)"
-        elif current_question_field == "freelancer_email":
-            field_hint = "THE FIELD BEING ASKED: freelancer_email (the user's own email)"
-        elif current_question_field == "client_email":
-            field_hint = "THE FIELD BEING ASKED: client_email (the client's email)"
-        else:
-            field_hint = f"THE FIELD BEING ASKED: {current_question_field}"
+    field_hint = _FIELD_HINTS.get(
+        current_question_field,
+        f"THE FIELD BEING ASKED: {current_question_field}" if current_question_field else "",
+    )
     
+    # Only send fields that have values - SYSTEM_PROMPT spells out the full schema,
+    # and ensure_spec_structure restores the rest
     prompt = f"""Current contract spec:
-{json.dumps(current_spec, indent=2, default=str)}
+{json_utils.dumps(_compact(current_spec), indent=True)}
 
 {field_hint}
 
@@ -170,6 +190,20 @@ Return the updated spec with the new information."""
         }
 
 
+def _compact(value: Any) -> Any:
+    """Recursively drop keys whose values are None, "", [] or {}."""
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            item = _compact(item)
+            if item is not None and item != "" and item != [] and item != {}:
+                compacted[key] = item
+        return compacted
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+    return value
+
+
 def ensure_spec_structure(spec: Dict[str, Any]) -> Dict[str, Any]:
     """Ensure all required nested structures exist in the spec."""
     template = get_empty_contract_spec()
@@ -183,8 +217,13 @@ def ensure_spec_structure(spec: Dict[str, Any]) -> Dict[str, Any]:
             elif value is not None:
                 result[key] = value
         return result
-    
-    return deep_merge(template, spec)
+
+    merged = deep_merge(template, spec)
+
+    # Deliverables are always dicts from here on, so downstream loops skip type checks
+    merged["deliverables"] = [coerce_deliverable(d) for d in merged.get("deliverables") or []]
+
+    return merged
 
 
 def capitalize_name(name: str) -> str:
@@ -229,21 +268,25 @@ def capitalize_name(name: str) -> str:
 def format_spec_values(spec: Dict[str, Any]) -> Dict[str, Any]:
     """Post-process spec to ensure proper formatting of names and text."""
     
+    # Only written to when .get() found a value, so the shared fallback is never mutated
+    freelancer = spec.get("freelancer") or _EMPTY
+    client = spec.get("client") or _EMPTY
+    
     # Format freelancer name
-    if spec.get("freelancer") and spec["freelancer"].get("name"):
-        spec["freelancer"]["name"] = capitalize_name(spec["freelancer"]["name"])
+    if freelancer.get("name"):
+        freelancer["name"] = capitalize_name(freelancer["name"])
     
     # Format freelancer business name
-    if spec.get("freelancer") and spec["freelancer"].get("business_name"):
-        spec["freelancer"]["business_name"] = capitalize_name(spec["freelancer"]["business_name"])
+    if freelancer.get("business_name"):
+        freelancer["business_name"] = capitalize_name(freelancer["business_name"])
     
     # Format client name
-    if spec.get("client") and spec["client"].get("name"):
-        spec["client"]["name"] = capitalize_name(spec["client"]["name"])
+    if client.get("name"):
+        client["name"] = capitalize_name(client["name"])
     
     # Format client business name
-    if spec.get("client") and spec["client"].get("business_name"):
-        spec["client"]["business_name"] = capitalize_name(spec["client"]["business_name"])
+    if client.get("business_name"):
+        client["business_name"] = capitalize_name(client["business_name"])
     
     # Format title - ensure it's properly capitalized
     if spec.get("title"):
@@ -261,25 +304,16 @@ def format_spec_values(spec: Dict[str, Any]) -> Dict[str, Any]:
             spec["title"] = " ".join(result)
     
     # Format deliverables - ensure proper capitalization
-    if spec.get("deliverables"):
-        formatted_deliverables = []
-        for d in spec["deliverables"]:
-            if isinstance(d, dict):
-                if d.get("item"):
-                    item = d["item"].strip()
-                    # Capitalize first letter
-                    if item and not item[0].isupper():
-                        d["item"] = item[0].upper() + item[1:]
-                if d.get("description"):
-                    desc = d["description"].strip()
-                    if desc and not desc[0].isupper():
-                        d["description"] = desc[0].upper() + desc[1:]
-                formatted_deliverables.append(d)
-            elif isinstance(d, str):
-                d = d.strip()
-                if d and not d[0].isupper():
-                    d = d[0].upper() + d[1:]
-                formatted_deliverables.append(d)
-        spec["deliverables"] = formatted_deliverables
-    
+    # (ensure_spec_structure has already coerced every deliverable to a dict)
+    for d in spec.get("deliverables") or []:
+        if d.get("item"):
+            item = d["item"].strip()
+            # Capitalize first letter
+            if item and not item[0].isupper():
+                d["item"] = item[0].upper() + item[1:]
+        if d.get("description"):
+            desc = d["description"].strip()
+            if desc and not desc[0].isupper():
+                d["description"] = desc[0].upper() + desc[1:]
+
     return spec
@@ -2,9 +2,13 @@
 Validate Spec Node
 Validates the contract spec and produces a list of issues/warnings.
 """
+from types import MappingProxyType
 from typing import Dict, Any, List
 from ..contract_schema import calculate_missing_fields, is_generic_name
 
+# Shared read-only fallback for missing sections (only ever read via .get)
+_EMPTY = MappingProxyType({})
+
 
 async def validate_spec_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -12,14 +16,14 @@ async def validate_spec_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Validates the spec and identifies any issues.
     Writes: "validation_result", "is_valid", "issues", "warnings"
     """
-    spec = state.get("contract_spec") or {}
+    spec = state.get("contract_spec") or _EMPTY
     
     issues = []  # Blocking issues
     warnings = []  # Non-blocking warnings
     
     # === PARTY VALIDATION ===
-    freelancer = spec.get("freelancer", {}) or {}
-    client = spec.get("client", {}) or {}
+    freelancer = spec.get("freelancer") or _EMPTY
+    client = spec.get("client") or _EMPTY
     
     if not freelancer.get("name"):
         issues.append("Freelancer name is required")
@@ -42,15 +46,13 @@ async def validate_spec_node(state: Dict[str, Any]) -> Dict[str, Any]:
     if not deliverables:
         issues.append("At least one deliverable must be specified")
     else:
+        # Deliverables are coerced to dicts when the spec is ingested
         for i, d in enumerate(deliverables):
-            if isinstance(d, dict):
-                if not d.get("item"):
-                    issues.append(f"Deliverable {i+1} is missing an item name")
-            elif not d:
-                issues.append(f"Deliverable {i+1} is empty")
+            if not d.get("item"):
+                issues.append(f"Deliverable {i+1} is missing an item name")
     
     # === PAYMENT VALIDATION ===
-    payment = spec.get("payment", {}) or {}
+    payment = spec.get("payment") or _EMPTY
     if not payment.get("amount"):
         issues.append("Payment amount is required")
     elif isinstance(payment.get("amount"), (int, float)) and payment["amount"] <= 0:
@@ -63,32 +65,32 @@ async def validate_spec_node(state: Dict[str, Any]) -> Dict[str, Any]:
         warnings.append("Payment schedule not specified")
     
     # === TIMELINE VALIDATION ===
-    timeline = spec.get("timeline", {}) or {}
+    timeline = spec.get("timeline") or _EMPTY
     if not timeline.get("deadline"):
         issues.append("Project deadline is required")
     
     # === QUALITY STANDARDS VALIDATION ===
-    quality = spec.get("quality_standards", {}) or {}
+    quality = spec.get("quality_standards") or _EMPTY
     if quality.get("max_revisions") is None:
         warnings.append("Number of revisions not specified, defaulting to 2")
     
     # === FAILURE SCENARIOS VALIDATION ===
-    failure = spec.get("failure_scenarios", {}) or {}
+    failure = spec.get("failure_scenarios") or _EMPTY
     
-    late = failure.get("late_delivery", {}) or {}
+    late = failure.get("late_delivery") or _EMPTY
     if not late.get("penalty_type"):
         warnings.append("Late delivery policy not specified")
     
-    non_del = failure.get("non_delivery", {}) or {}
+    non_del = failure.get("non_delivery") or _EMPTY
     if non_del.get("refund_percentage") is None:
         warnings.append("Non-delivery refund not specified")
     
-    rejection = failure.get("client_rejection", {}) or {}
+    rejection = failure.get("client_rejection") or _EMPTY
     if not rejection.get("process"):
         warnings.append("Client rejection process not specified")
     
     # === DISPUTE RESOLUTION VALIDATION ===
-    dispute = spec.get("dispute_resolution", {}) or {}
+    dispute = spec.get("dispute_resolution") or _EMPTY
     if not dispute.get("method"):
         warnings.append("Dispute resolution method not specified")
     
@@ -0,0 +1,103 @@
+"""
+PDF Disk Cache
+Renders contract PDFs into a bounded on-disk cache, one directory per session.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Dict
+
+from . import json_utils
+from .pdf_generator import format_today, write_contract_pdf
+
+
+# Rendered PDFs are kept on disk, keyed by contract content and the printed
+# date, so repeat downloads skip rendering. Each session gets its own
+# directory so deleting a contract can drop its PDFs. The least recently
+# used are swept past the cap.
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", Path(tempfile.gettempdir()) / "pebblepay-pdfs"))
+PDF_CACHE_MAX_FILES = int(os.getenv("PDF_CACHE_MAX_FILES", "256"))
+
+# Temp files this old are leftovers from a failed render, not one in progress
+_STALE_AGE = 3600
+
+
+def _session_dir(session_id: str) -> Path:
+    """The session's cache directory (hashed, as the id comes from the URL)."""
+    return PDF_CACHE_DIR / hashlib.blake2b(session_id.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cached_pdf_path(session_id: str, contract_text: str, contract_spec: Dict[str, Any]) -> Path:
+    """Path of the contract's PDF in the disk cache, rendering it first if needed."""
+    # The PDF prints today's date, so a new day means a new file
+    today = format_today()
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (contract_text, json_utils.dumps(contract_spec), today):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    session_dir = _session_dir(session_id)
+    path = session_dir / f"{digest.hexdigest()}.pdf"
+
+    try:
+        os.utime(path)  # Cache hit - mark as recently used for the sweep
+        return path
+    except FileNotFoundError:
+        pass
+
+    # Render to a temp file and rename into place, so no reader (in this or
+    # another worker) ever sees a half-written PDF
+    session_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=session_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            write_contract_pdf(contract_text, contract_spec, tmp, today)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+    _sweep_pdf_cache()
+    return path
+
+
+def purge_session_pdfs(session_id: str) -> None:
+    """Delete every cached PDF of a session."""
+    shutil.rmtree(_session_dir(session_id), ignore_errors=True)
+
+
+def _sweep_pdf_cache() -> None:
+    """
+    Delete the least recently used PDFs beyond PDF_CACHE_MAX_FILES, temp
+    files left by failed renders, and session directories left empty.
+    """
+    entries = []
+    for pdf in PDF_CACHE_DIR.glob("*/*.pdf"):
+        with suppress(FileNotFoundError):
+            entries.append((pdf.stat().st_mtime, pdf))
+    entries.sort()
+    for _, pdf in entries[:max(len(entries) - PDF_CACHE_MAX_FILES, 0)]:
+        with suppress(FileNotFoundError):
+            pdf.unlink()
+
+    stale_before = time.time() - _STALE_AGE
+    for tmp in PDF_CACHE_DIR.glob("*/*.tmp"):
+        with suppress(FileNotFoundError):
+            if tmp.stat().st_mtime < stale_before:
+                tmp.unlink()
+
+    # Files directly in the cache dir predate the per-session layout and
+    # can never be served again
+    for leftover in [*PDF_CACHE_DIR.glob("*.pdf"), *PDF_CACHE_DIR.glob("*.tmp")]:
+        with suppress(FileNotFoundError):
+            leftover.unlink()
+
+    # Only old directories, so one a render has just created is left alone
+    for session_dir in PDF_CACHE_DIR.iterdir():
+        with suppress(OSError):  # Not a directory, not empty, or already gone
+            if session_dir.stat().st_mtime < stale_before:
+                session_dir.rmdir()
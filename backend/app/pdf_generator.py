@@ -3,28 +3,170 @@ PDF Generator for Contracts
 Creates professional, well-formatted legal document PDF contracts.
 """
 import io
+import re
+import threading
+from copy import copy
 from datetime import datetime
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, BinaryIO, Optional, Tuple
+from xml.sax.saxutils import escape as _xml_escape
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch, mm
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, 
-    HRFlowable, PageBreak
+    HRFlowable, PageBreak, Flowable
 )
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 from reportlab.pdfgen import canvas
 
 
+# Markdown patterns stripped by clean_markdown, compiled once at import
+_RE_BOLD_STAR = re.compile(r'\*\*([^*]+)\*\*')
+_RE_BOLD_UND = re.compile(r'__([^_]+)__')
+_RE_ITAL_STAR = re.compile(r'(?<!\*)\*([^*]+)\*(?!\*)')
+_RE_ITAL_UND = re.compile(r'(?<!_)_([^_]+)_(?!_)')
+_RE_HEADER = re.compile(r'^#{1,6}\s*', re.MULTILINE)
+_RE_BULLET = re.compile(r'^\s*\*\s+', re.MULTILINE)
+_RE_STAR_STRAY = re.compile(r'^\s*\*+\s*', re.MULTILINE)
+
+# Paragraph classification in _iter_flowables
+_BULLET_CHARS = frozenset('•-*')
+_PARTY_KEYWORDS = ('freelancer:', 'client:', 'email:', 'address:')
+_BULLET_TR = str.maketrans({'•': '&bull;'})
+
+
+# Legal document styles - Times font for formal look.
+# Built once at import; ParagraphStyle objects are read-only during a build.
+_TITLE_STYLE = ParagraphStyle(
+    'ContractTitle',
+    fontName='Times-Bold',
+    fontSize=16,
+    spaceAfter=6,
+    alignment=TA_CENTER,
+    textColor=colors.black,
+    leading=20,
+)
+
+_SUBTITLE_STYLE = ParagraphStyle(
+    'Subtitle',
+    fontName='Times-Roman',
+    fontSize=11,
+    spaceAfter=18,
+    alignment=TA_CENTER,
+    textColor=colors.HexColor('#333333'),
+)
+
+_SECTION_STYLE = ParagraphStyle(
+    'Section',
+    fontName='Times-Bold',
+    fontSize=11,
+    spaceBefore=14,
+    spaceAfter=6,
+    textColor=colors.black,
+    leading=14,
+)
+
+_BODY_STYLE = ParagraphStyle(
+    'Body',
+    fontName='Times-Roman',
+    fontSize=10,
+    leading=13,
+    alignment=TA_JUSTIFY,
+    spaceAfter=8,
+)
+
+_CLAUSE_STYLE = ParagraphStyle(
+    'Clause',
+    fontName='Times-Roman',
+    fontSize=10,
+    leading=13,
+    alignment=TA_JUSTIFY,
+    spaceAfter=6,
+    leftIndent=0.25*inch,
+)
+
+_PARTY_STYLE = ParagraphStyle(
+    'Party',
+    fontName='Times-Roman',
+    fontSize=10,
+    leading=13,
+    spaceAfter=4,
+    leftIndent=0.4*inch,
+)
+
+_FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    fontName='Helvetica',
+    fontSize=8,
+    textColor=colors.grey,
+    alignment=TA_CENTER,
+)
+
+# Boilerplate paragraphs, parsed once at import. Each build yields a shallow
+# copy so wrap/split state is never shared between concurrent builds.
+_WHEREAS_P = Paragraph(
+    "<b>WHEREAS</b>, the parties desire to enter into this Agreement for the provision of services as set forth herein;",
+    _BODY_STYLE
+)
+_NOW_THEREFORE_P = Paragraph(
+    "<b>NOW, THEREFORE</b>, in consideration of the mutual covenants and agreements contained herein, and for other good and valuable consideration, the receipt and sufficiency of which are hereby acknowledged, the parties agree as follows:",
+    _BODY_STYLE
+)
+_WITNESS_P = Paragraph(
+    "<b>IN WITNESS WHEREOF</b>, the parties have executed this Agreement as of the date first written above.",
+    _BODY_STYLE
+)
+_SIG_FREELANCER_P = Paragraph("<b>FREELANCER:</b>", _BODY_STYLE)
+_SIG_CLIENT_P = Paragraph("<b>CLIENT:</b>", _BODY_STYLE)
+
+# Fixed signature table rows and style (Table copies rows while normalizing)
+_SIG_BLANK_ROW = ["", "", ""]
+_SIG_LINE_ROW = ["Signature: ________________________", "", "Signature: ________________________"]
+_SIG_DATE_ROW = ["Date: ____________________________", "", "Date: ____________________________"]
+_SIG_COL_WIDTHS = [2.5*inch, 0.75*inch, 2.5*inch]
+_SIG_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+
+# Per-thread output buffer, reused across PDFs instead of allocating one per call
+_buf_tls = threading.local()
+
+
+def _get_buf() -> io.BytesIO:
+    """Return this thread's PDF buffer, emptied and ready for a new document."""
+    buf = getattr(_buf_tls, "buf", None)
+    if buf is None:
+        buf = _buf_tls.buf = io.BytesIO()
+    else:
+        buf.seek(0)
+        buf.truncate()
+    return buf
+
+
 class NumberedCanvas(canvas.Canvas):
     """Custom canvas to add page numbers in footer."""
+    # Canvas attributes that _startPage() resets for every page - the only
+    # state needed to emit a deferred page once the total page count is known
+    _PAGE_STATE = (
+        '_pageNumber', '_pagesize', '_code', '_psCommandsBeforePage',
+        '_psCommandsAfterPage', '_currentPageHasImages', '_formsinuse',
+        '_annotationrefs', '_formData', '_colorsUsed', '_shadingUsed', '_extgstate',
+    )
+    
     def __init__(self, *args, **kwargs):
         canvas.Canvas.__init__(self, *args, **kwargs)
         self.pages = []
         
     def showPage(self):
-        self.pages.append(dict(self.__dict__))
+        state = self.__dict__
+        self.pages.append({key: state[key] for key in self._PAGE_STATE})
         self._startPage()
         
     def save(self):
@@ -46,37 +188,92 @@ class NumberedCanvas(canvas.Canvas):
 
 def clean_markdown(text: str) -> str:
     """Remove any markdown formatting from text."""
-    import re
+    # Contract text is requested as plain text, so most inputs contain no
+    # markers at all. Each pass only runs when its marker character is
+    # present; removing one kind of marker never introduces another, so the
+    # checks can be made once up front.
+    has_star = '*' in text
+    has_underscore = '_' in text
     
     # Remove bold (**text** or __text__)
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
+    if has_star:
+        text = _RE_BOLD_STAR.sub(r'\1', text)
+    if has_underscore:
+        text = _RE_BOLD_UND.sub(r'\1', text)
     
     # Remove italic (*text* or _text_)
-    text = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', r'\1', text)
-    text = re.sub(r'(?<!_)_([^_]+)_(?!_)', r'\1', text)
+    if has_star:
+        text = _RE_ITAL_STAR.sub(r'\1', text)
+    if has_underscore:
+        text = _RE_ITAL_UND.sub(r'\1', text)
     
     # Remove markdown headers
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    
-    # Replace asterisk bullets with dashes
-    text = re.sub(r'^\s*\*\s+', '- ', text, flags=re.MULTILINE)
+    if '#' in text:
+        text = _RE_HEADER.sub('', text)
     
-    # Clean stray asterisks
-    text = re.sub(r'^\s*\*+\s*', '', text, flags=re.MULTILINE)
+    if has_star:
+        # Replace asterisk bullets with dashes
+        text = _RE_BULLET.sub('- ', text)
+        
+        # Clean stray asterisks
+        text = _RE_STAR_STRAY.sub('', text)
     
     return text
 
 
+class _LazyParagraph(Flowable):
+    """Paragraph that defers markup parsing until the frame first measures it."""
+    
+    def __init__(self, text: str, style: ParagraphStyle):
+        Flowable.__init__(self)
+        self.text = text
+        self.style = style
+        self._para = None
+    
+    def _paragraph(self) -> Paragraph:
+        if self._para is None:
+            self._para = Paragraph(self.text, self.style)
+        return self._para
+    
+    def wrapOn(self, canv, aW, aH):
+        return self._paragraph().wrapOn(canv, aW, aH)
+    
+    def wrap(self, aW, aH):
+        return self._paragraph().wrap(aW, aH)
+    
+    def splitOn(self, canv, aW, aH):
+        return self._paragraph().splitOn(canv, aW, aH)
+    
+    def split(self, aW, aH):
+        return self._paragraph().split(aW, aH)
+    
+    def drawOn(self, canvas, x, y, _sW=0):
+        self._paragraph().drawOn(canvas, x, y, _sW)
+        # Drawn once per page, so the parsed fragments can go
+        self._para = None
+
+
 def generate_contract_pdf(contract_text: str, contract_spec: Dict[str, Any]) -> bytes:
     """Generate a professional legal document PDF."""
+    buffer = _get_buf()
+    write_contract_pdf(contract_text, contract_spec, buffer)
+    return buffer.getvalue()
+
+
+def format_today() -> str:
+    """Today's date as printed on the contract ("Effective Date" and footer)."""
+    return datetime.now().strftime("%B %d, %Y")
+
+
+def write_contract_pdf(
+    contract_text: str, contract_spec: Dict[str, Any], sink: BinaryIO, today: Optional[str] = None
+) -> None:
+    """Render the contract PDF into a writable binary file object, dated today unless given."""
     # Clean any markdown from contract text
     contract_text = clean_markdown(contract_text)
     
-    buffer = io.BytesIO()
-    
     doc = SimpleDocTemplate(
-        buffer,
+        sink,
         pagesize=letter,
         rightMargin=1.25*inch,
         leftMargin=1.25*inch,
@@ -84,95 +281,26 @@ def generate_contract_pdf(contract_text: str, contract_spec: Dict[str, Any]) ->
         bottomMargin=1*inch,
     )
     
-    styles = getSampleStyleSheet()
-    
-    # Legal document styles - Times font for formal look
-    title_style = ParagraphStyle(
-        'ContractTitle',
-        fontName='Times-Bold',
-        fontSize=16,
-        spaceAfter=6,
-        alignment=TA_CENTER,
-        textColor=colors.black,
-        leading=20,
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        fontName='Times-Roman',
-        fontSize=11,
-        spaceAfter=18,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#333333'),
-    )
-    
-    section_style = ParagraphStyle(
-        'Section',
-        fontName='Times-Bold',
-        fontSize=11,
-        spaceBefore=14,
-        spaceAfter=6,
-        textColor=colors.black,
-        leading=14,
-    )
-    
-    body_style = ParagraphStyle(
-        'Body',
-        fontName='Times-Roman',
-        fontSize=10,
-        leading=13,
-        alignment=TA_JUSTIFY,
-        spaceAfter=8,
-    )
-    
-    clause_style = ParagraphStyle(
-        'Clause',
-        fontName='Times-Roman',
-        fontSize=10,
-        leading=13,
-        alignment=TA_JUSTIFY,
-        spaceAfter=6,
-        leftIndent=0.25*inch,
-    )
-    
-    party_style = ParagraphStyle(
-        'Party',
-        fontName='Times-Roman',
-        fontSize=10,
-        leading=13,
-        spaceAfter=4,
-        leftIndent=0.4*inch,
-    )
-    
-    footer_style = ParagraphStyle(
-        'Footer',
-        fontName='Helvetica',
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-    )
-    
-    story = []
-    today = datetime.now().strftime("%B %d, %Y")
+    # Build with page numbers
+    flowables = _iter_flowables(contract_text, contract_spec, today or format_today())
+    doc.build(list(flowables), canvasmaker=NumberedCanvas)
+
+
+def _iter_flowables(contract_text: str, contract_spec: Dict[str, Any], today: str):
+    """Yield the story flowables for an already-cleaned contract."""
     
     # Title
     title = contract_spec.get("title", "FREELANCE SERVICE AGREEMENT")
-    story.append(Paragraph(title.upper(), title_style))
-    story.append(Paragraph(f"Effective Date: {today}", subtitle_style))
+    yield Paragraph(_xml_escape(_upper_title(title)), _TITLE_STYLE)
+    yield Paragraph(f"Effective Date: {today}", _SUBTITLE_STYLE)
     
     # Top line
-    story.append(HRFlowable(width="100%", thickness=1.5, color=colors.black, spaceAfter=16))
+    yield HRFlowable(width="100%", thickness=1.5, color=colors.black, spaceAfter=16)
     
     # Preamble
-    story.append(Paragraph(
-        "<b>WHEREAS</b>, the parties desire to enter into this Agreement for the provision of services as set forth herein;",
-        body_style
-    ))
-    story.append(Paragraph(
-        "<b>NOW, THEREFORE</b>, in consideration of the mutual covenants and agreements contained herein, and for other good and valuable consideration, the receipt and sufficiency of which are hereby acknowledged, the parties agree as follows:",
-        body_style
-    ))
-    story.append(Spacer(1, 0.1*inch))
+    yield copy(_WHEREAS_P)
+    yield copy(_NOW_THEREFORE_P)
+    yield Spacer(1, 0.1*inch)
     
     # Parse sections
     sections = parse_contract_sections(contract_text)
@@ -180,37 +308,21 @@ def generate_contract_pdf(contract_text: str, contract_spec: Dict[str, Any]) ->
     for section_title, section_content in sections:
         if section_title:
             formatted_title = format_section_title(section_title)
-            story.append(Paragraph(formatted_title, section_style))
+            yield Paragraph(_xml_escape(formatted_title), _SECTION_STYLE)
         
-        for para in section_content.split('\n\n'):
-            para = para.strip()
-            if not para:
-                continue
-            
-            # Numbered clauses
-            if para and len(para) > 2 and para[0].isdigit() and para[1] == '.':
-                story.append(Paragraph(format_clause(para), clause_style))
-            # Bullet points
-            elif para.startswith('•') or para.startswith('-') or para.startswith('*'):
-                para = para.replace('•', '&bull;').replace('- ', '&bull; ').replace('* ', '&bull; ')
-                story.append(Paragraph(f"&nbsp;&nbsp;&nbsp;{para}", body_style))
-            # Party info
-            elif any(kw in para.lower() for kw in ['freelancer:', 'client:', 'email:', 'address:']):
-                story.append(Paragraph(para, party_style))
-            else:
-                story.append(Paragraph(para, body_style))
+        # Body paragraphs are parsed lazily - they make up most of a long contract
+        paras = [p for p in map(str.strip, section_content.split('\n\n')) if p]
+        for text, style in map(_tag_paragraph, paras):
+            yield _LazyParagraph(text, style)
         
-        story.append(Spacer(1, 0.05*inch))
+        yield Spacer(1, 0.05*inch)
     
     # Signature page
-    story.append(PageBreak())
-    story.append(HRFlowable(width="100%", thickness=1.5, color=colors.black, spaceAfter=16))
+    yield PageBreak()
+    yield HRFlowable(width="100%", thickness=1.5, color=colors.black, spaceAfter=16)
     
-    story.append(Paragraph(
-        "<b>IN WITNESS WHEREOF</b>, the parties have executed this Agreement as of the date first written above.",
-        body_style
-    ))
-    story.append(Spacer(1, 0.4*inch))
+    yield copy(_WITNESS_P)
+    yield Spacer(1, 0.4*inch)
     
     # Get names
     freelancer = contract_spec.get("freelancer", {}) or {}
@@ -220,40 +332,55 @@ def generate_contract_pdf(contract_text: str, contract_spec: Dict[str, Any]) ->
     
     # Signature table
     sig_data = [
-        [Paragraph("<b>FREELANCER:</b>", body_style), "", Paragraph("<b>CLIENT:</b>", body_style)],
-        ["", "", ""],
-        ["", "", ""],
-        ["Signature: ________________________", "", "Signature: ________________________"],
-        ["", "", ""],
+        [copy(_SIG_FREELANCER_P), "", copy(_SIG_CLIENT_P)],
+        _SIG_BLANK_ROW,
+        _SIG_BLANK_ROW,
+        _SIG_LINE_ROW,
+        _SIG_BLANK_ROW,
         [f"Print Name: {freelancer_name}", "", f"Print Name: {client_name}"],
-        ["", "", ""],
-        ["Date: ____________________________", "", "Date: ____________________________"],
+        _SIG_BLANK_ROW,
+        _SIG_DATE_ROW,
     ]
     
-    sig_table = Table(sig_data, colWidths=[2.5*inch, 0.75*inch, 2.5*inch])
-    sig_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    sig_table = Table(sig_data, colWidths=_SIG_COL_WIDTHS)
+    sig_table.setStyle(_SIG_TABLE_STYLE)
     
-    story.append(sig_table)
+    yield sig_table
     
     # Footer
-    story.append(Spacer(1, 0.5*inch))
-    story.append(HRFlowable(width="100%", thickness=0.5, color=colors.grey, spaceAfter=8))
-    story.append(Paragraph(f"Contract generated by PebblePay • {today}", footer_style))
-    
-    # Build with page numbers
-    doc.build(story, canvasmaker=NumberedCanvas)
-    
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+    yield Spacer(1, 0.5*inch)
+    yield HRFlowable(width="100%", thickness=0.5, color=colors.grey, spaceAfter=8)
+    yield Paragraph(f"Contract generated by PebblePay • {today}", _FOOTER_STYLE)
 
 
+@lru_cache(maxsize=128)
+def _upper_title(title: str) -> str:
+    """Uppercase a contract title (titles repeat across generated contracts)."""
+    return title.upper()
+
+
+def _tag_paragraph(para: str) -> Tuple[str, ParagraphStyle]:
+    """Escape a body paragraph and pick its markup and style."""
+    # Contract text is plain text, so & and < must not reach the Paragraph parser raw
+    para = _xml_escape(para)
+    first = para[0]
+    
+    # Numbered clauses
+    if first.isdigit() and len(para) > 2 and para[1] == '.':
+        return format_clause(para), _CLAUSE_STYLE
+    # Bullet points
+    if first in _BULLET_CHARS:
+        para = para.translate(_BULLET_TR).replace('- ', '&bull; ').replace('* ', '&bull; ')
+        return f"&nbsp;&nbsp;&nbsp;{para}", _BODY_STYLE
+    # Party info (every keyword ends in ':', so most clauses skip the lowercasing)
+    if ':' in para:
+        lowered = para.lower()
+        if any(kw in lowered for kw in _PARTY_KEYWORDS):
+            return para, _PARTY_STYLE
+    return para, _BODY_STYLE
+
+
+@lru_cache(maxsize=512)
 def format_section_title(title: str) -> str:
     """Format section title for legal document."""
     title = title.strip()
@@ -274,32 +401,31 @@ def format_clause(clause: str) -> str:
 
 def parse_contract_sections(contract_text: str) -> list:
     """Parse contract text into sections."""
+    # Blank lines never start or extend a section
+    lines = [l for l in map(str.strip, contract_text.split('\n')) if l]
+    
+    # Drop ===/--- rule lines (unless they are themselves uppercase headers)
+    if '===' in contract_text or '---' in contract_text:
+        lines = [l for l in lines if not l.startswith(('===', '---')) or l.isupper() and len(l) < 50]
+    
+    # Headers are numbered ("1. PARTIES") or short all-caps lines
+    header_idx = [
+        i for i, l in enumerate(lines)
+        if l.isupper() and 3 < len(l) < 50 or l[0].isdigit() and '.' in l[1:3] and len(l) > 2
+    ]
+    
     sections = []
-    current_title = None
-    current_content = []
+    if not header_idx:
+        if lines:
+            sections.append((None, '\n'.join(lines)))
+        return sections
     
-    for line in contract_text.split('\n'):
-        line_stripped = line.strip()
-        is_header = False
-        
-        if line_stripped and len(line_stripped) > 2:
-            if line_stripped[0].isdigit() and '.' in line_stripped[:3]:
-                is_header = True
-            elif line_stripped.isupper() and 3 < len(line_stripped) < 50:
-                is_header = True
-            elif line_stripped.startswith('===') or line_stripped.startswith('---'):
-                continue
-        
-        if is_header:
-            if current_title or current_content:
-                sections.append((current_title, '\n'.join(current_content)))
-            current_title = line_stripped
-            current_content = []
-        elif line_stripped:
-            current_content.append(line_stripped)
+    # Untitled preamble before the first header
+    if header_idx[0]:
+        sections.append((None, '\n'.join(lines[:header_idx[0]])))
     
-    if current_title or current_content:
-        sections.append((current_title, '\n'.join(current_content)))
+    for start, end in zip(header_idx, header_idx[1:] + [len(lines)]):
+        sections.append((lines[start], '\n'.join(lines[start + 1:end])))
     
     return sections
 
@@ -310,35 +436,17 @@ def generate_simple_contract_pdf(contract_spec: Dict[str, Any]) -> bytes:
     return generate_contract_pdf(contract_text, contract_spec)
 
 
-def build_contract_from_spec(spec: Dict[str, Any]) -> str:
-    """Build contract text from specification."""
-    freelancer = spec.get("freelancer", {}) or {}
-    client = spec.get("client", {}) or {}
-    payment = spec.get("payment", {}) or {}
-    timeline = spec.get("timeline", {}) or {}
-    quality = spec.get("quality_standards", {}) or {}
-    failure = spec.get("failure_scenarios", {}) or {}
-    dispute = spec.get("dispute_resolution", {}) or {}
-    
-    deliverables = spec.get("deliverables", []) or []
-    deliverables_text = "\n".join(
-        f"• {d.get('item', d) if isinstance(d, dict) else d}" 
-        for d in deliverables
-    ) or "• As agreed"
-    
-    currency_symbol = "£" if payment.get("currency") == "GBP" else "$" if payment.get("currency") == "USD" else ""
-    amount = payment.get("amount", "[Amount]")
-    
-    return f"""
+# Fallback contract used when only a spec is available; filled with format_map
+_CONTRACT_TMPL = """
 1. PARTIES
 
 This Agreement is entered into between:
 
-Freelancer: {freelancer.get('name', '[Name]')}
-Email: {freelancer.get('email', '[Email]')}
+Freelancer: {freelancer_name}
+Email: {freelancer_email}
 
-Client: {client.get('name', '[Name]')}
-Email: {client.get('email', '[Email]')}
+Client: {client_name}
+Email: {client_email}
 
 2. SCOPE OF WORK
 
@@ -348,19 +456,19 @@ The Freelancer agrees to provide the following deliverables to the Client:
 
 3. COMPENSATION
 
-Total Fee: {currency_symbol}{amount} {payment.get('currency', '')}
-Payment Schedule: {payment.get('schedule', 'Upon completion of services')}
+Total Fee: {currency_symbol}{amount} {currency}
+Payment Schedule: {schedule}
 
 Payment shall be made according to the schedule set forth above. Late payments shall accrue interest at the rate of 1.5% per month.
 
 4. TIMELINE
 
-Commencement Date: {timeline.get('start_date', 'Upon execution of this Agreement')}
-Completion Deadline: {timeline.get('deadline', '[To be determined]')}
+Commencement Date: {start_date}
+Completion Deadline: {deadline}
 
 5. REVISIONS AND MODIFICATIONS
 
-The Client shall be entitled to {quality.get('max_revisions', 'two (2)')} rounds of revisions at no additional charge. Additional revisions shall be billed at the Freelancer's standard hourly rate.
+The Client shall be entitled to {max_revisions} rounds of revisions at no additional charge. Additional revisions shall be billed at the Freelancer's standard hourly rate.
 
 6. INTELLECTUAL PROPERTY
 
@@ -380,7 +488,7 @@ The Freelancer's liability under this Agreement shall not exceed the total fees
 
 10. DISPUTE RESOLUTION
 
-Method: {dispute.get('method', 'Mediation, followed by binding arbitration if necessary')}
+Method: {dispute_method}
 
 Any disputes arising under this Agreement shall be resolved through the method specified above.
 
@@ -392,3 +500,37 @@ This Agreement constitutes the entire agreement between the parties and supersed
 
 This Agreement shall be governed by and construed in accordance with the laws of the jurisdiction in which the Freelancer is located.
 """
+
+_CCY = {"GBP": "£", "USD": "$"}
+
+
+def build_contract_from_spec(spec: Dict[str, Any]) -> str:
+    """Build contract text from specification."""
+    freelancer = spec.get("freelancer", {}) or {}
+    client = spec.get("client", {}) or {}
+    payment = spec.get("payment", {}) or {}
+    timeline = spec.get("timeline", {}) or {}
+    quality = spec.get("quality_standards", {}) or {}
+    dispute = spec.get("dispute_resolution", {}) or {}
+    
+    deliverables = spec.get("deliverables", []) or []
+    deliverables_text = "\n".join(
+        f"• {d.get('item', d) if isinstance(d, dict) else d}" 
+        for d in deliverables
+    ) or "• As agreed"
+    
+    return _CONTRACT_TMPL.format_map({
+        "freelancer_name": freelancer.get('name', '[Name]'),
+        "freelancer_email": freelancer.get('email', '[Email]'),
+        "client_name": client.get('name', '[Name]'),
+        "client_email": client.get('email', '[Email]'),
+        "deliverables_text": deliverables_text,
+        "currency_symbol": _CCY.get(payment.get("currency"), ""),
+        "amount": payment.get("amount", "[Amount]"),
+        "currency": payment.get('currency', ''),
+        "schedule": payment.get('schedule', 'Upon completion of services'),
+        "start_date": timeline.get('start_date', 'Upon execution of this Agreement'),
+        "deadline": timeline.get('deadline', '[To be determined]'),
+        "max_revisions": quality.get('max_revisions', 'two (2)'),
+        "dispute_method": dispute.get('method', 'Mediation, followed by binding arbitration if necessary'),
+    })
@@ -2,20 +2,26 @@
 Solidity Generation Service
 Orchestrates the SolidityGenerationAgent to convert visual blocks into Solidity code.
 """
+import re
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from ..agents.solidity_agent import SolidityGenerationAgent
 
 
-# Cache the agent instance for reuse
-_agent_instance: Optional[SolidityGenerationAgent] = None
+# Block id keywords, in the order they take precedence when an id has several
+_CATEGORIES = ("freelancer", "client", "payment", "deliverable", "timeline")
+_CATEGORY_RE = re.compile("|".join(_CATEGORIES))
+
+
+@lru_cache(maxsize=1)
+def _make_agent() -> SolidityGenerationAgent:
+    """Create the agent once; later calls return the cached instance."""
+    return SolidityGenerationAgent()
 
 
 def get_agent() -> SolidityGenerationAgent:
     """Get or create the Solidity generation agent instance."""
-    global _agent_instance
-    if _agent_instance is None:
-        _agent_instance = SolidityGenerationAgent()
-    return _agent_instance
+    return _make_agent()
 
 
 async def generate_smart_contract(
@@ -79,25 +85,30 @@ def _enhance_blocks_with_spec(
     enhanced_blocks = []
     
     for block in blocks:
-        enhanced_block = block.copy()
-        block_id = block.get("id", "")
-        block_data = enhanced_block.get("data", {}).copy()
+        category = _block_category(block.get("id", ""))
+        
+        # Blocks are only read downstream, so unmatched ones pass through uncopied
+        if category is None:
+            enhanced_blocks.append(block)
+            continue
+        
+        block_data = block.get("data", {}).copy()
         
         # Enhance party blocks with freelancer/client info
-        if "freelancer" in block_id.lower():
+        if category == "freelancer":
             freelancer = contract_spec.get("freelancer", {})
             if freelancer:
                 block_data["subtitle"] = freelancer.get("name", "Freelancer")
                 block_data["content"] = f"Address: {freelancer.get('email', 'freelancer@example.com')}"
         
-        elif "client" in block_id.lower():
+        elif category == "client":
             client = contract_spec.get("client", {})
             if client:
                 block_data["subtitle"] = client.get("name", "Client")
                 block_data["content"] = f"Address: {client.get('email', 'client@example.com')}"
         
         # Enhance payment blocks
-        elif "payment" in block_id.lower():
+        elif category == "payment":
             payment = contract_spec.get("payment", {})
             if payment:
                 amount = payment.get("amount", 0)
@@ -106,20 +117,27 @@ def _enhance_blocks_with_spec(
                 block_data["content"] = f"Schedule: {payment.get('schedule', 'on_completion')}"
         
         # Enhance deliverables blocks
-        elif "deliverable" in block_id.lower():
+        elif category == "deliverable":
             deliverables = contract_spec.get("deliverables", [])
             if deliverables:
                 items = [d.get("item", str(d)) if isinstance(d, dict) else str(d) for d in deliverables]
                 block_data["content"] = ", ".join(items[:3])
         
         # Enhance timeline blocks
-        elif "timeline" in block_id.lower():
+        elif category == "timeline":
             timeline = contract_spec.get("timeline", {})
             if timeline:
                 block_data["subtitle"] = f"Deadline: {timeline.get('deadline', 'TBD')}"
                 block_data["content"] = f"Start: {timeline.get('start_date', 'TBD')}"
         
-        enhanced_block["data"] = block_data
-        enhanced_blocks.append(enhanced_block)
+        enhanced_blocks.append({**block, "data": block_data})
     
     return enhanced_blocks
+
+
+def _block_category(block_id: str) -> Optional[str]:
+    """Return the highest-precedence category keyword in a block id, if any."""
+    found = _CATEGORY_RE.findall(block_id.lower())
+    if not found:
+        return None
+    return next(c for c in _CATEGORIES if c in found)
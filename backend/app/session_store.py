@@ -0,0 +1,183 @@
+"""
+Session Store
+Keeps chat agents between requests, in process memory, Redis or SQLite.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+
+from . import json_utils
+from .database import DB_PATH
+from .graph_workflow import create_contract_graph_agent
+from .state_graph import GraphAgent
+
+
+# How long a session is kept after it was last saved (seconds)
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+
+# Most sessions held by the in-memory store before the least recently used is evicted
+MAX_MEMORY_SESSIONS = int(os.getenv("MAX_MEMORY_SESSIONS", "1000"))
+
+
+class MemorySessionStore:
+    """
+    Agents held in a bounded LRU cache whose entries expire SESSION_TTL after
+    they were last saved. Only visible to the worker process that created
+    them - use for local dev. Only touched from the event loop thread, and no
+    method awaits mid-update, so no lock is needed.
+    """
+
+    def __init__(self, maxsize: int = MAX_MEMORY_SESSIONS, ttl: int = SESSION_TTL):
+        self._agents: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, session_id: str) -> Optional[GraphAgent]:
+        return self._agents.get(session_id)
+
+    async def save(self, session_id: str, agent: GraphAgent) -> None:
+        self._agents[session_id] = agent
+
+    async def delete(self, session_id: str) -> None:
+        self._agents.pop(session_id, None)
+
+    async def size(self) -> Optional[int]:
+        """Number of live sessions."""
+        return len(self._agents)
+
+
+class RedisSessionStore:
+    """
+    Agent state serialized to Redis under "session:{id}" with a sliding TTL.
+    Shared by every worker, so the API can run with more than one process.
+    """
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL):
+        import redis.asyncio as redis  # Optional dependency, only needed for this backend
+
+        self._redis = redis.from_url(url)
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    async def get(self, session_id: str) -> Optional[GraphAgent]:
+        data = await self._redis.get(self._key(session_id))
+        if data is None:
+            return None
+        return _restore(data)
+
+    async def save(self, session_id: str, agent: GraphAgent) -> None:
+        await self._redis.setex(self._key(session_id), self._ttl, _serialize(agent))
+
+    async def delete(self, session_id: str) -> None:
+        await self._redis.delete(self._key(session_id))
+
+    async def size(self) -> Optional[int]:
+        """Not tracked - counting keys would need a SCAN over the whole keyspace."""
+        return None
+
+
+class SqliteSessionStore:
+    """
+    Agent state serialized to an "agent_sessions" table in a WAL-mode SQLite
+    file. Survives restarts and is shared by every worker on the host.
+    Queries run in worker threads, each keeping its own open connection.
+    """
+
+    def __init__(self, path: str, ttl: int = SESSION_TTL):
+        self._path = str(path)
+        self._ttl = ttl
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS agent_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Drop sessions that expired while the server was down
+            conn.execute("DELETE FROM agent_sessions WHERE updated_at < ?", (time.time() - self._ttl,))
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, session_id: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT data FROM agent_sessions WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - self._ttl),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _save(self, session_id: str, data: bytes) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO agent_sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session_id, data, time.time()),
+            )
+
+    def _delete(self, session_id: str) -> None:
+        with self._conn() as conn:
+            conn.execute("DELETE FROM agent_sessions WHERE session_id = ?", (session_id,))
+
+    def _count(self) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM agent_sessions WHERE updated_at >= ?", (time.time() - self._ttl,)
+        ).fetchone()
+        return row[0]
+
+    async def get(self, session_id: str) -> Optional[GraphAgent]:
+        data = await asyncio.to_thread(self._get, session_id)
+        if data is None:
+            return None
+        return _restore(data)
+
+    async def save(self, session_id: str, agent: GraphAgent) -> None:
+        await asyncio.to_thread(self._save, session_id, _serialize(agent))
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._delete, session_id)
+
+    async def size(self) -> Optional[int]:
+        """Number of live sessions."""
+        return await asyncio.to_thread(self._count)
+
+
+def _serialize(agent: GraphAgent) -> bytes:
+    """Agent state and turn count as JSON, for the shared backends."""
+    return json_utils.dumps_bytes({"state": agent.state, "turn_count": agent.turn_count})
+
+
+def _restore(data: bytes) -> GraphAgent:
+    """Rebuild a fresh agent around state saved by _serialize."""
+    saved = json_utils.loads(data)
+    agent = create_contract_graph_agent()
+    agent.state = saved["state"]
+    agent.turn_count = saved["turn_count"]
+    return agent
+
+
+def create_session_store():
+    """
+    Pick the backend from SESSION_BACKEND ("memory", "redis" or "sqlite",
+    default "memory"). The Redis backend connects to REDIS_URL; the SQLite
+    backend uses SESSION_DB_PATH, defaulting to the contracts database.
+    """
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    if backend == "redis":
+        return RedisSessionStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if backend == "sqlite":
+        return SqliteSessionStore(os.getenv("SESSION_DB_PATH", str(DB_PATH)))
+    return MemorySessionStore()
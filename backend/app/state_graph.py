@@ -2,12 +2,14 @@
 State Graph and Graph Agent Implementation
 A simplified implementation inspired by LangGraph/SpoonOS patterns.
 """
-from typing import Dict, Any, Callable, Optional, List, Awaitable
+from typing import Dict, Any, AsyncIterator, Callable, Optional, List, Awaitable, Tuple, Union
 import asyncio
 
 
 NodeFunction = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
 ConditionFunction = Callable[[Dict[str, Any]], str]
+# A single node, or a list of sibling nodes that run concurrently
+Destination = Union[str, List[str]]
 
 
 class StateGraph:
@@ -17,11 +19,12 @@ class StateGraph:
     Nodes are async functions that take state and return state updates.
     Edges define the flow between nodes.
     Conditional edges allow dynamic routing based on state.
+    An edge to a list of nodes runs them concurrently (see add_edge).
     """
     
     def __init__(self):
         self.nodes: Dict[str, NodeFunction] = {}
-        self.edges: Dict[str, str] = {}  # source -> destination
+        self.edges: Dict[str, Destination] = {}  # source -> destination(s)
         self.conditional_edges: Dict[str, tuple] = {}  # source -> (condition_fn, mapping)
         self.entry_point: Optional[str] = None
         self.terminal_nodes: set = set()
@@ -30,8 +33,16 @@ class StateGraph:
         """Add a node to the graph."""
         self.nodes[name] = func
     
-    def add_edge(self, source: str, destination: str) -> None:
-        """Add a direct edge between nodes."""
+    def add_edge(self, source: str, destination: Destination) -> None:
+        """
+        Add a direct edge between nodes.
+        
+        A list destination fans out: the listed nodes run together with
+        asyncio.gather against the same state, and their updates are merged in
+        list order once all have finished. They must not depend on each other's
+        updates and should write disjoint keys. Execution then follows the
+        first sibling's outgoing edge, so give all siblings the same join node.
+        """
         self.edges[source] = destination
     
     def add_conditional_edges(
@@ -51,7 +62,7 @@ class StateGraph:
         """Mark a node as terminal (ends execution)."""
         self.terminal_nodes.add(node)
     
-    def compile(self) -> "CompiledGraph":
+    def compile(self, debug: bool = False) -> "CompiledGraph":
         """Compile the graph for execution."""
         return CompiledGraph(
             nodes=self.nodes.copy(),
@@ -59,6 +70,7 @@ class StateGraph:
             conditional_edges=self.conditional_edges.copy(),
             entry_point=self.entry_point,
             terminal_nodes=self.terminal_nodes.copy(),
+            debug=debug,
         )
 
 
@@ -68,56 +80,72 @@ class CompiledGraph:
     def __init__(
         self,
         nodes: Dict[str, NodeFunction],
-        edges: Dict[str, str],
+        edges: Dict[str, Destination],
         conditional_edges: Dict[str, tuple],
         entry_point: Optional[str],
         terminal_nodes: set,
+        debug: bool = False,
     ):
         self.nodes = nodes
         self.edges = edges
         self.conditional_edges = conditional_edges
         self.entry_point = entry_point
         self.terminal_nodes = terminal_nodes
+        self.debug = debug  # Record the node path in state["_visited_nodes"]
+        # Resolve every node's outgoing edge once, so each hop is a single lookup
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], Optional[Destination]]] = {
+            name: self._make_router(name) for name in nodes
+        }
     
-    async def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def run(self, state: Dict[str, Any]) -> None:
         """
         Execute the graph starting from the entry point.
         
         Args:
-            state: The initial state dictionary
-            
-        Returns:
-            The final state after execution
+            state: The state dictionary, updated in place with every node's
+                updates - nothing is returned, callers keep their reference
+        """
+        async for _ in self.astream(state):
+            pass
+    
+    async def astream(self, state: Dict[str, Any]) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Execute the graph like run(), yielding (node name, updates) as each
+        node finishes. The updates are already merged into state when yielded.
         """
         if not self.entry_point:
             raise ValueError("No entry point defined")
         
-        current_node = self.entry_point
-        visited = []  # Track visited nodes to prevent infinite loops
-        max_iterations = 20  # Safety limit
+        current_node: Destination = self.entry_point
+        visited = [] if self.debug else None  # Node path, only kept when debugging
+        max_iterations = 20  # Safety limit against infinite loops
         
         for _ in range(max_iterations):
-            if current_node not in self.nodes:
-                raise ValueError(f"Node '{current_node}' not found in graph")
+            group = current_node if isinstance(current_node, list) else [current_node]
+            for name in group:
+                if name not in self.nodes:
+                    raise ValueError(f"Node '{name}' not found in graph")
             
-            visited.append(current_node)
+            if visited is not None:
+                visited.extend(group)
             
-            # Execute the current node
-            node_func = self.nodes[current_node]
-            try:
-                updates = await node_func(state)
-                
-                # Merge updates into state
-                if updates:
+            # Execute the current node (or fan-out siblings concurrently)
+            if len(group) == 1:
+                results = [await self._call_node(group[0], state)]
+            else:
+                results = await asyncio.gather(*(self._call_node(name, state) for name in group))
+            
+            # Merge updates into state
+            for updates in results:
+                # Nodes that mutate and return the state itself need no merge
+                if updates and updates is not state:
                     state.update(updates)
             
-            except Exception as e:
-                print(f"[Graph] Error in node '{current_node}': {e}")
-                # Continue execution but note the error
-                state["_last_error"] = str(e)
+            for name, updates in zip(group, results):
+                yield name, updates
             
             # Determine next node
-            next_node = self._get_next_node(current_node, state)
+            next_node = self._get_next_node(group[0], state)
             
             if next_node is None:
                 # No next node - we're done
@@ -125,27 +153,45 @@ class CompiledGraph:
             
             current_node = next_node
         
-        state["_visited_nodes"] = visited
-        return state
+        if visited is not None:
+            state["_visited_nodes"] = visited
+    
+    async def _call_node(self, name: str, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run one node and return its updates, recording errors in state."""
+        try:
+            return await self.nodes[name](state)
+        except Exception as e:
+            print(f"[Graph] Error in node '{name}': {e}")
+            # Continue execution but note the error
+            state["_last_error"] = str(e)
+            return None
     
-    def _get_next_node(self, current: str, state: Dict[str, Any]) -> Optional[str]:
-        """Determine the next node to execute."""
+    def _get_next_node(self, current: str, state: Dict[str, Any]) -> Optional[Destination]:
+        """Determine the next node(s) to execute."""
+        return self._dispatch[current](state)
+    
+    def _make_router(self, source: str) -> Callable[[Dict[str, Any]], Optional[Destination]]:
+        """Build the function that picks the node after `source`."""
         # Check for direct edge first
-        if current in self.edges:
-            return self.edges[current]
+        if source in self.edges:
+            destination = self.edges[source]
+            return lambda state: destination
         
         # Check for conditional edge
-        if current in self.conditional_edges:
-            condition_fn, mapping = self.conditional_edges[current]
-            result = condition_fn(state)
-            if result in mapping:
-                return mapping[result]
-            else:
+        if source in self.conditional_edges:
+            condition_fn, mapping = self.conditional_edges[source]
+            
+            def route(state: Dict[str, Any]) -> Optional[str]:
+                result = condition_fn(state)
+                if result in mapping:
+                    return mapping[result]
                 print(f"[Graph] Condition returned '{result}' but no mapping found")
                 return None
+            
+            return route
         
         # No edge found - terminal node
-        return None
+        return lambda state: None
 
 
 class GraphAgent:
@@ -181,11 +227,23 @@ class GraphAgent:
         self.turn_count += 1
         self.state["_turn"] = self.turn_count
         
-        # Run the graph
-        self.state = await self.graph.run(self.state)
+        # Run the graph (updates self.state in place)
+        await self.graph.run(self.state)
         
         return self.state
     
+    async def astream(self, user_input: str) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Like run(), but yields (node name, updates) as each node finishes.
+        self.state holds the final state once the iteration is exhausted.
+        """
+        self.state["input"] = user_input
+        self.turn_count += 1
+        self.state["_turn"] = self.turn_count
+        
+        async for step in self.graph.astream(self.state):
+            yield step
+    
     def reset(self, initial_state: Optional[Dict[str, Any]] = None) -> None:
         """Reset the agent state."""
         self.state = initial_state.copy() if initial_state else {}
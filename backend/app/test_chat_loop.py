@@ -3,102 +3,109 @@ Interactive Contract Assistant Test Loop
 Tests the multi-agent workflow from the terminal.
 """
 import asyncio
-import json
 import os
 import sys
+import traceback
+from operator import itemgetter
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.graph_workflow import create_contract_graph_agent, get_opening_message
-
-
-def print_divider(char: str = "-", width: int = 60):
-    """Print a divider line."""
-    print(char * width)
+from app import json_utils
+
+
+RULE = "=" * 60
+
+# Static welcome screen, joined once at import
+_HEADER = "\n".join([
+    RULE,
+    "🤝 CONTRACT ASSISTANT - Interactive Test",
+    RULE,
+    "",
+    "Welcome! I'm your contract assistant. I'll help you create a",
+    "ROBUST freelance contract by asking important questions.",
+    "",
+    "I'll gather:",
+    "  ✓ Party names and contact info",
+    "  ✓ Deliverables and payment details",
+    "  ✓ Timeline and revision policy",
+    "  ✓ What happens if things go wrong",
+    "  ✓ Dispute resolution process",
+    "",
+    "Commands:",
+    "  - Type your responses naturally",
+    "  - Type 'debug' to see the current state",
+    "  - Type 'spec' to see the contract specification",
+    "  - Type 'contract' to see the generated contract (if ready)",
+    "  - Type 'summary' to see the summary (if ready)",
+    "  - Type 'missing' to see what info is still needed",
+    "  - Type 'quit' or 'exit' to leave",
+    "",
+    "Let's get started!",
+    "",
+    "-" * 60,
+])
+
+
+def print_lines(lines: list):
+    """Write a whole screen with a single print call."""
+    print("\n".join(lines))
 
 
 def print_header():
     """Print the welcome header."""
-    print_divider("=")
-    print("🤝 CONTRACT ASSISTANT - Interactive Test")
-    print_divider("=")
-    print()
-    print("Welcome! I'm your contract assistant. I'll help you create a")
-    print("ROBUST freelance contract by asking important questions.")
-    print()
-    print("I'll gather:")
-    print("  ✓ Party names and contact info")
-    print("  ✓ Deliverables and payment details")
-    print("  ✓ Timeline and revision policy")
-    print("  ✓ What happens if things go wrong")
-    print("  ✓ Dispute resolution process")
-    print()
-    print("Commands:")
-    print("  - Type your responses naturally")
-    print("  - Type 'debug' to see the current state")
-    print("  - Type 'spec' to see the contract specification")
-    print("  - Type 'contract' to see the generated contract (if ready)")
-    print("  - Type 'summary' to see the summary (if ready)")
-    print("  - Type 'missing' to see what info is still needed")
-    print("  - Type 'quit' or 'exit' to leave")
-    print()
-    print("Let's get started!")
-    print()
-    print_divider()
+    print(_HEADER)
 
 
 def print_debug(state: dict):
     """Print debug information about the current state."""
-    print("\n" + "=" * 60)
-    print("DEBUG: Current State")
-    print("=" * 60)
+    lines = ["", RULE, "DEBUG: Current State", RULE]
     
     # Show key state values
-    print(f"\n📊 Questions asked: {state.get('questions_asked', 0)}")
-    print(f"📋 Next action: {state.get('next_action', 'None')}")
-    print(f"📝 Decision reason: {state.get('decision_reason', 'None')}")
+    lines.append(f"\n📊 Questions asked: {state.get('questions_asked', 0)}")
+    lines.append(f"📋 Next action: {state.get('next_action', 'None')}")
+    lines.append(f"📝 Decision reason: {state.get('decision_reason', 'None')}")
     
     # Show missing fields
     missing = state.get("missing_fields", [])
     if missing:
-        print(f"\n❓ Missing fields ({len(missing)}):")
-        for field in missing[:10]:
-            print(f"   - {field}")
+        lines.append(f"\n❓ Missing fields ({len(missing)}):")
+        lines.extend(f"   - {field}" for field in missing[:10])
         if len(missing) > 10:
-            print(f"   ... and {len(missing) - 10} more")
+            lines.append(f"   ... and {len(missing) - 10} more")
     else:
-        print("\n✅ No missing fields!")
+        lines.append("\n✅ No missing fields!")
     
     # Show if contract is ready
     if state.get("contract_text"):
-        print("\n✅ Contract has been generated")
+        lines.append("\n✅ Contract has been generated")
     if state.get("summary"):
-        print("✅ Summary has been generated")
+        lines.append("✅ Summary has been generated")
     
-    print()
-    print_divider("=")
+    lines.append("")
+    lines.append(RULE)
+    print_lines(lines)
 
 
 def print_spec(state: dict):
     """Print the current contract specification."""
     spec = state.get("contract_spec", {})
-    print("\n" + "=" * 60)
-    print("CONTRACT SPECIFICATION")
-    print("=" * 60)
-    print(json.dumps(spec, indent=2, default=str))
-    print("=" * 60 + "\n")
+    print_lines([
+        "",
+        RULE,
+        "CONTRACT SPECIFICATION",
+        RULE,
+        json_utils.dumps(spec, indent=True),
+        RULE + "\n",
+    ])
 
 
 def print_contract(state: dict):
     """Print the generated contract."""
     contract = state.get("contract_text")
     if contract:
-        print("\n" + "=" * 60)
-        print("GENERATED CONTRACT")
-        print("=" * 60)
-        print(contract)
-        print("=" * 60 + "\n")
+        print_lines(["", RULE, "GENERATED CONTRACT", RULE, contract, RULE + "\n"])
     else:
         print("\n⚠️ Contract not yet generated. Keep answering questions!\n")
 
@@ -121,20 +128,30 @@ def print_missing(state: dict):
         print("\n✅ All required information has been gathered!\n")
         return
     
-    print("\n" + "=" * 60)
-    print(f"MISSING INFORMATION ({len(missing)} fields)")
-    print("=" * 60)
+    lines = ["", RULE, f"MISSING INFORMATION ({len(missing)} fields)", RULE]
     
-    # Sort by priority
-    sorted_missing = sorted(missing, key=get_field_priority)
+    # Look each field up once, then sort by priority
+    decorated = [(get_field_priority(f), f, get_field_question(f)) for f in missing]
+    decorated.sort(key=itemgetter(0))
     
-    for i, field in enumerate(sorted_missing, 1):
-        priority = get_field_priority(field)
-        question = get_field_question(field)
-        print(f"\n{i}. [{field}] (Priority: {priority})")
-        print(f"   Q: {question}")
+    for i, (priority, field, question) in enumerate(decorated, 1):
+        lines.append(f"\n{i}. [{field}] (Priority: {priority})")
+        lines.append(f"   Q: {question}")
     
-    print("\n" + "=" * 60 + "\n")
+    lines.append("\n" + RULE + "\n")
+    print_lines(lines)
+
+
+QUIT_COMMANDS = frozenset({"quit", "exit", "q"})
+
+# Debug commands typed at the prompt, each printing part of the agent state
+COMMANDS = {
+    "debug": print_debug,
+    "spec": print_spec,
+    "contract": print_contract,
+    "summary": print_summary,
+    "missing": print_missing,
+}
 
 
 async def main():
@@ -156,28 +173,14 @@ async def main():
                 continue
             
             # Handle commands
-            if user_input.lower() in {"quit", "exit", "q"}:
+            cmd = user_input.lower()
+            if cmd in QUIT_COMMANDS:
                 print("\nGoodbye! 👋\n")
                 break
             
-            if user_input.lower() == "debug":
-                print_debug(agent.state)
-                continue
-            
-            if user_input.lower() == "spec":
-                print_spec(agent.state)
-                continue
-            
-            if user_input.lower() == "contract":
-                print_contract(agent.state)
-                continue
-            
-            if user_input.lower() == "summary":
-                print_summary(agent.state)
-                continue
-            
-            if user_input.lower() == "missing":
-                print_missing(agent.state)
+            handler = COMMANDS.get(cmd)
+            if handler:
+                handler(agent.state)
                 continue
             
             # Run the agent with the user's message
@@ -205,9 +208,14 @@ async def main():
             break
         except Exception as e:
             print(f"\n❌ Error: {e}\n")
-            import traceback
             traceback.print_exc()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Prefer uvloop where available (not on Windows); stock asyncio otherwise
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -8,17 +8,40 @@ Usage:
     
     Or from the backend directory:
     python app/test_contract_agent.py
+    
+    Add --sequential to run the tests one after another (easier to debug).
 """
 import asyncio
-import json
+import io
 import os
 import sys
+import traceback
+from contextvars import ContextVar
+from typing import Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.graph_workflow import run_from_chat, run_from_blocks, create_unified_contract_agent
 from app.nodes.validate_spec_node import format_validation_report
+from app import json_utils
+
+
+# Buffer for the current test task - None means write straight to the console
+_task_output: ContextVar[Optional[io.StringIO]] = ContextVar("_task_output", default=None)
+
+
+class _TaskStdout(io.TextIOBase):
+    """Stand-in for sys.stdout that sends each test task's prints to its own buffer."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def write(self, text: str) -> int:
+        return (_task_output.get() or self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
 
 
 def print_divider(title: str = "", char: str = "═", width: int = 70):
@@ -61,7 +84,7 @@ async def test_chat_input():
     print("\n⏳ Processing...")
     
     # Run the agent
-    result = await run_from_chat(chat_input)
+    result = await run_from_chat(chat_input, debug=True)
     
     # Print results
     print_section("VISITED NODES", " → ".join(result.get("_visited_nodes", [])))
@@ -73,13 +96,13 @@ async def test_chat_input():
         print_section("NORMALIZATION NOTES", "\n".join(result["normalization_notes"]))
     
     if result.get("contract_spec"):
-        print_section("CONTRACT SPEC (Key Fields)", json.dumps({
+        print_section("CONTRACT SPEC (Key Fields)", json_utils.dumps({
             "title": result["contract_spec"].get("title"),
             "freelancer": result["contract_spec"].get("freelancer", {}).get("name"),
             "client": result["contract_spec"].get("client", {}).get("name"),
             "payment": result["contract_spec"].get("payment"),
             "deadline": result["contract_spec"].get("timeline", {}).get("deadline"),
-        }, indent=2))
+        }, indent=True))
     
     if result.get("contract_text"):
         print_section("CONTRACT TEXT (First 2000 chars)", result["contract_text"][:2000] + "...")
@@ -198,7 +221,7 @@ async def test_blocks_input():
     print("\n⏳ Processing...")
     
     # Run the agent
-    result = await run_from_blocks(blocks_input)
+    result = await run_from_blocks(blocks_input, debug=True)
     
     # Print results
     print_section("VISITED NODES", " → ".join(result.get("_visited_nodes", [])))
@@ -213,14 +236,14 @@ async def test_blocks_input():
         print_section("NORMALIZATION NOTES", "\n".join(result["normalization_notes"]))
     
     if result.get("contract_spec"):
-        print_section("CONTRACT SPEC (Key Fields)", json.dumps({
+        print_section("CONTRACT SPEC (Key Fields)", json_utils.dumps({
             "title": result["contract_spec"].get("title"),
             "freelancer": result["contract_spec"].get("freelancer", {}).get("name"),
             "client": result["contract_spec"].get("client", {}).get("name"),
             "payment": result["contract_spec"].get("payment"),
             "deadline": result["contract_spec"].get("timeline", {}).get("deadline"),
             "deliverables_count": len(result["contract_spec"].get("deliverables", [])),
-        }, indent=2))
+        }, indent=True))
     
     if result.get("contract_text"):
         print_section("CONTRACT TEXT (First 2000 chars)", result["contract_text"][:2000] + "...")
@@ -254,11 +277,11 @@ async def test_minimal_blocks():
     
     print(f"\n📝 INPUT (Minimal blocks - missing fields):")
     print("-" * 50)
-    print(json.dumps(blocks_input, indent=2))
+    print(json_utils.dumps(blocks_input, indent=True))
     
     print("\n⏳ Processing...")
     
-    result = await run_from_blocks(blocks_input)
+    result = await run_from_blocks(blocks_input, debug=True)
     
     print_section("VISITED NODES", " → ".join(result.get("_visited_nodes", [])))
     
@@ -268,42 +291,83 @@ async def test_minimal_blocks():
     return result
 
 
-async def main():
+TESTS = (test_chat_input, test_blocks_input, test_minimal_blocks)
+
+
+async def _run_buffered(test):
+    """Run one test with its output captured. Returns (output, error or None)."""
+    buffer = io.StringIO()
+    _task_output.set(buffer)
+    try:
+        await test()
+    except Exception as e:
+        buffer.write(f"\n❌ Error: {e}\n")
+        traceback.print_exc(file=buffer)
+        return buffer.getvalue(), e
+    return buffer.getvalue(), None
+
+
+async def run_sequential() -> bool:
+    """Run the tests one after another, printing as they go."""
+    try:
+        for i, test in enumerate(TESTS):
+            if i:
+                print("\n" + "─" * 70 + "\n")
+            await test()
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        traceback.print_exc()
+        return False
+    return True
+
+
+async def run_concurrent() -> bool:
+    """Run the tests at the same time, then print each one's output in order."""
+    console = sys.stdout
+    sys.stdout = _TaskStdout(console)
+    try:
+        results = await asyncio.gather(*(_run_buffered(test) for test in TESTS))
+    finally:
+        sys.stdout = console
+    
+    ok = True
+    for i, (output, error) in enumerate(results):
+        if i:
+            print("\n" + "─" * 70 + "\n")
+        print(output, end="")
+        if error is not None:
+            ok = False
+    return ok
+
+
+async def main(sequential: bool = False):
     """Run all tests."""
     print("\n" + "═" * 70)
     print("   CONTRACT AGENT TEST SUITE")
     print("   Testing both chat and blocks input")
     print("═" * 70)
     
-    try:
-        # Test 1: Chat input
-        await test_chat_input()
-        
-        print("\n" + "─" * 70 + "\n")
-        
-        # Test 2: Full blocks input
-        await test_blocks_input()
-        
-        print("\n" + "─" * 70 + "\n")
-        
-        # Test 3: Minimal blocks (validation)
-        await test_minimal_blocks()
-        
-        print_divider("ALL TESTS COMPLETE", "═")
-        print("\n✅ Contract agent is working!")
-        print("   - Accepts chat_input (natural language)")
-        print("   - Accepts blocks_input (visual graph JSON)")
-        print("   - Normalizes specs with defaults")
-        print("   - Validates and reports issues")
-        print("   - Generates contract text")
-        print("   - Produces plain-English summary")
-        
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    ok = await (run_sequential() if sequential else run_concurrent())
+    if not ok:
+        return
+    
+    print_divider("ALL TESTS COMPLETE", "═")
+    print("\n✅ Contract agent is working!")
+    print("   - Accepts chat_input (natural language)")
+    print("   - Accepts blocks_input (visual graph JSON)")
+    print("   - Normalizes specs with defaults")
+    print("   - Validates and reports issues")
+    print("   - Generates contract text")
+    print("   - Produces plain-English summary")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Prefer uvloop where available (not on Windows); stock asyncio otherwise
+    sequential = "--sequential" in sys.argv[1:]
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main(sequential))
+    else:
+        uvloop.run(main(sequential))
 
@@ -2,63 +2,127 @@
 PebblePay Backend API Server
 Integrates the contract agent system with a REST API.
 """
+import base64
+import hashlib
 import os
+import re
 import uuid
 import time
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import Dict, Any, AsyncIterator, Mapping, Optional, Tuple
+from cachetools import LRUCache
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import asyncio
-import io
 
 from dotenv import load_dotenv
 from pathlib import Path
 
 # Load environment variables FIRST, before importing modules that need them
+# (the LLM client, session store and TTS settings read them at import time)
 root_dir = Path(__file__).parent.parent
 load_dotenv(dotenv_path=root_dir / ".env")
 load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=False)
 
-from app.graph_workflow import create_contract_graph_agent, get_opening_message
+from app.graph_workflow import compile_chat_graph, create_contract_graph_agent, get_opening_message
+from app.state_graph import GraphAgent
 from app.pdf_generator import generate_contract_pdf
-from app.nodes.explain_contract_node import explain_contract_node
+from app.pdf_cache import cached_pdf_path, purge_session_pdfs
+from app.nodes.explain_contract_node import explain_contract_node, generate_fallback_summary
 from app.database import init_db, save_session, get_session, list_sessions, delete_session
 from app.services.solidity_service import generate_smart_contract
+from app import json_utils
+from app.session_store import create_session_store
+from app.cors import StaticCORSMiddleware
+from app.logging_utils import get_logger, start_logging, stop_logging
 
 # ——— TTS Support (from main branch)
-from tts import router as tts_router
+from tts import router as tts_router, close_client as close_tts_client, split_sentences, synthesize
 
-# Initialize FastAPI app
-app = FastAPI(title="PebblePay API", version="1.0.0")
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (via json_utils) when it is installed."""
+    def render(self, content: Any) -> bytes:
+        return json_utils.dumps_bytes(content, default=None)
+
+
+logger = get_logger("api")
+
+# "thread" (default) or "process" - see lifespan
+PDF_EXECUTOR = os.getenv("PDF_EXECUTOR", "thread").lower()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-worker setup and teardown: logging, database, PDF pool, warmup, HTTP client."""
+    start_logging()
     init_db()
+    # ReportLab rendering is CPU-bound; keep it off the event loop and out of
+    # the default executor used for sync route handlers. PDF_EXECUTOR=process
+    # renders in worker processes instead, so renders run in parallel
+    # rather than taking turns on the GIL.
+    if PDF_EXECUTOR == "process":
+        app.state.pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    else:
+        app.state.pdf_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pdf")
+    
+    # Warm up so the first chat/download doesn't pay the one-off costs:
+    # compile the chat graph (cached, and shared by every agent) and let
+    # ReportLab load its fonts and metrics with a throwaway render
+    compile_chat_graph()
+    await asyncio.get_running_loop().run_in_executor(
+        app.state.pdf_pool, generate_contract_pdf, "WARMUP\n\n1. Warmup\nWarmup.", {}
+    )
+    
+    yield
+    
+    app.state.pdf_pool.shutdown(wait=False)
+    await close_tts_client()
+    stop_logging()
 
-# Configure CORS for frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://localhost:5173",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:3001",
-        "http://127.0.0.1:5173"
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="PebblePay API",
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
+# Configure CORS for frontend
+CORS_ORIGINS = [
+    "http://localhost:3000",
+    "http://localhost:3001",
+    "http://localhost:5173",
+    "http://127.0.0.1:3000",
+    "http://127.0.0.1:3001",
+    "http://127.0.0.1:5173"
+]
+
+# The same origins as one pattern, so CORSMiddleware does a single regex match per request
+CORS_ORIGIN_REGEX = r"^http://(localhost|127\.0\.0\.1):(3000|3001|5173)$"
+
+if os.getenv("FAST_CORS") == "1":
+    # Exact-match origins with prebuilt headers; preflights never reach the app
+    app.add_middleware(StaticCORSMiddleware, allow_origins=CORS_ORIGINS)
+else:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origin_regex=CORS_ORIGIN_REGEX,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
 # ——— Include TTS Router
 app.include_router(tts_router, prefix="/api")
 
-# ——— Agent Session Storage
-agent_sessions: Dict[str, Any] = {}
+# ——— Agent Session Storage (memory, Redis or SQLite, see SESSION_BACKEND)
+sessions = create_session_store()
 
 
 class ChatMessage(BaseModel):
@@ -105,125 +169,229 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    return {"status": "healthy"}
+    return {"status": "healthy", "sessions": await sessions.size()}
+
+
+# The opening message is static, so build it once
+_OPENING = get_opening_message()
+
+
+# ...and its response body, so it is served pre-encoded with a strong ETag
+_OPENING_JSON = json_utils.dumps_bytes({"message": _OPENING})
+_OPENING_HEADERS = {
+    "ETag": '"' + hashlib.blake2b(_OPENING_JSON, digest_size=16).hexdigest() + '"',
+    "Cache-Control": "public, max-age=300",
+}
 
 
 @app.get("/api/opening-message")
-async def get_opening_message_endpoint():
+async def get_opening_message_endpoint(request: Request):
     """Get the opening message for new conversations."""
-    return {"message": get_opening_message()}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match uses weak comparison, so ignore any W/ prefix
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or _OPENING_HEADERS["ETag"] in tags:
+            return Response(status_code=304, headers=_OPENING_HEADERS)
+    return Response(_OPENING_JSON, media_type="application/json", headers=_OPENING_HEADERS)
+
+
+async def _load_chat_session(session_id: Optional[str]) -> Tuple[str, GraphAgent, list]:
+    """Find the agent and chat history for a session, or start a new one."""
+    existing_chat_history = []
+    agent = await sessions.get(session_id) if session_id else None
+
+    # Create new session or load from database/memory
+    if agent is None:
+        # Check database for existing session
+        db_session = get_session(session_id) if session_id else None
+        
+        if db_session and db_session.get("contract_spec"):
+            # Restore session from database
+            agent = create_contract_graph_agent()
+            agent.state["contract_spec"] = db_session["contract_spec"]
+            if db_session.get("contract_text"):
+                agent.state["contract_text"] = db_session["contract_text"]
+            # Load existing chat history
+            existing_chat_history = db_session.get("chat_history", [])
+        else:
+            # Create new session
+            agent = create_contract_graph_agent()
+            session_id = str(uuid.uuid4())
+            # Add opening message to history
+            opening_msg = _OPENING
+            existing_chat_history = [{
+                "id": 1,
+                "type": "suggestion",
+                "text": opening_msg,
+                "suggestions": [
+                    "I'm designing a logo for a client",
+                    "I'm doing freelance writing work",
+                    "I'm providing consulting services",
+                    "I'm building a website"
+                ]
+            }]
+    else:
+        # Load existing chat history from database
+        db_session = get_session(session_id)
+        if db_session:
+            existing_chat_history = db_session.get("chat_history", [])
+
+    return session_id, agent, existing_chat_history
+
+
+async def _finish_chat_turn(
+    session_id: str, agent: GraphAgent, existing_chat_history: list, user_message: str
+) -> Dict[str, Any]:
+    """
+    Store the agent and chat history after a turn and build the response body
+    (a plain dict in the shape of ChatResponse - the values come straight from
+    the agent state, so there's nothing to validate).
+    """
+    state = agent.state
+    await sessions.save(session_id, agent)
+
+    assistant_message = state.get("assistant_message", "")
+    contract_spec = state.get("contract_spec")
+    contract_text = state.get("contract_text")
+    summary = state.get("summary")
+    missing_fields = state.get("missing_fields", [])
+
+    suggestions = None
+    if state.get("next_action") == "ASK_MORE" and missing_fields:
+        current_field = state.get("current_question_field")
+        suggestions = get_field_suggestions(current_field) if current_field else None
+
+    contract_ready = bool(contract_text)
+
+    # Build updated chat history from database
+    timestamp = int(time.time() * 1000)
+    
+    # Add the user message
+    existing_chat_history.append({
+        "id": timestamp,
+        "type": "user",
+        "text": user_message
+    })
+    
+    # Add the assistant response
+    existing_chat_history.append({
+        "id": timestamp + 1,
+        "type": "suggestion",
+        "text": assistant_message or "Processing...",
+        "suggestions": suggestions,
+        "contractReady": contract_ready
+    })
+
+    # Save session to database with updated chat history
+    save_session(
+        session_id=session_id,
+        contract_spec=contract_spec,
+        contract_text=contract_text,
+        chat_history=existing_chat_history,
+    )
+
+    return {
+        "response": assistant_message or "Processing...",
+        "session_id": session_id,
+        "contract_spec": contract_spec,
+        "contract_text": contract_text,
+        "summary": summary,
+        "missing_fields": missing_fields,
+        "suggestions": suggestions,
+        "contract_ready": contract_ready,
+    }
 
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(message: ChatMessage):
 
     try:
-        session_id = message.session_id
-        existing_chat_history = []
-
-        # Create new session or load from database/memory
-        if not session_id or session_id not in agent_sessions:
-            # Check database for existing session
-            db_session = get_session(session_id) if session_id else None
-            
-            if db_session and db_session.get("contract_spec"):
-                # Restore session from database
-                agent = create_contract_graph_agent()
-                agent.state["contract_spec"] = db_session["contract_spec"]
-                if db_session.get("contract_text"):
-                    agent.state["contract_text"] = db_session["contract_text"]
-                agent_sessions[session_id] = agent
-                # Load existing chat history
-                existing_chat_history = db_session.get("chat_history", [])
-            else:
-                # Create new session
-                agent = create_contract_graph_agent()
-                session_id = str(uuid.uuid4())
-                agent_sessions[session_id] = agent
-                # Add opening message to history
-                opening_msg = get_opening_message()
-                existing_chat_history = [{
-                    "id": 1,
-                    "type": "suggestion",
-                    "text": opening_msg,
-                    "suggestions": [
-                        "I'm designing a logo for a client",
-                        "I'm doing freelance writing work",
-                        "I'm providing consulting services",
-                        "I'm building a website"
-                    ]
-                }]
-        else:
-            agent = agent_sessions[session_id]
-            # Load existing chat history from database
-            db_session = get_session(session_id)
-            if db_session:
-                existing_chat_history = db_session.get("chat_history", [])
+        session_id, agent, existing_chat_history = await _load_chat_session(message.session_id)
 
         # Run agent step
-        state = await agent.run(message.message)
+        await agent.run(message.message)
 
-        assistant_message = state.get("assistant_message", "")
-        contract_spec = state.get("contract_spec")
-        contract_text = state.get("contract_text")
-        summary = state.get("summary")
-        missing_fields = state.get("missing_fields", [])
+        # Returning a Response skips response_model validation; the model still documents the schema
+        return FastJSONResponse(await _finish_chat_turn(session_id, agent, existing_chat_history, message.message))
 
-        suggestions = None
-        if state.get("next_action") == "ASK_MORE" and missing_fields:
-            current_field = state.get("current_question_field")
-            suggestions = get_field_suggestions(current_field) if current_field else None
+    except Exception as e:
+        logger.exception("chat handler failed")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        contract_ready = bool(contract_text)
 
-        # Build updated chat history from database
-        timestamp = int(time.time() * 1000)
-        
-        # Add the user message
-        existing_chat_history.append({
-            "id": timestamp,
-            "type": "user",
-            "text": message.message
-        })
-        
-        # Add the assistant response
-        existing_chat_history.append({
-            "id": timestamp + 1,
-            "type": "suggestion",
-            "text": assistant_message or "Processing...",
-            "suggestions": suggestions,
-            "contractReady": contract_ready
-        })
-
-        # Save session to database with updated chat history
-        save_session(
-            session_id=session_id,
-            contract_spec=contract_spec,
-            contract_text=contract_text,
-            chat_history=existing_chat_history,
-        )
+def _sse(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Events message."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + json_utils.dumps_bytes(data) + b"\n\n"
 
-        return ChatResponse(
-            response=assistant_message or "Processing...",
-            session_id=session_id,
-            contract_spec=contract_spec,
-            contract_text=contract_text,
-            summary=summary,
-            missing_fields=missing_fields,
-            suggestions=suggestions,
-            contract_ready=contract_ready,
-        )
 
+async def _speak(text: str) -> AsyncIterator[bytes]:
+    """Synthesize text sentence by sentence, yielding "audio" events in order."""
+    sentences = split_sentences(text)
+    # Start every sentence now; the first one is short, so its audio is ready early
+    tasks = [asyncio.create_task(synthesize(sentence)) for sentence in sentences]
+    try:
+        for index, (sentence, task) in enumerate(zip(sentences, tasks)):
+            try:
+                audio = await task
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                yield _sse("audio_error", {"index": index, "text": sentence, "detail": detail})
+                continue
+            yield _sse("audio", {"index": index, "text": sentence, "audio": base64.b64encode(audio).decode("ascii")})
+    finally:
+        # Client went away (or we're done) - don't leave syntheses running
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage, speak: bool = False):
+    """
+    Same turn as /api/chat, streamed as Server-Sent Events: a "node" event as
+    each workflow step finishes, then "done" with the ChatResponse payload
+    (or "error"). Read it with fetch() - EventSource can't send a POST body.
+    
+    With ?speak=true the reply is also voiced: it is split into sentences
+    that are synthesized concurrently, and each one is sent as an "audio"
+    event (base64 MP3, in order) as soon as it and the ones before it are ready.
+    """
+    try:
+        session_id, agent, existing_chat_history = await _load_chat_session(message.session_id)
     except Exception as e:
-        print("[API] Error:", e)
+        logger.exception("chat stream failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for node, _ in agent.astream(message.message):
+                yield _sse("node", {"node": node, "session_id": session_id})
+            response = await _finish_chat_turn(session_id, agent, existing_chat_history, message.message)
+            yield _sse("done", response)
+            if speak:
+                async for event in _speak(response["response"]):
+                    yield event
+        except Exception as e:
+            logger.exception("chat stream failed")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Anything but letters, digits (any script), spaces, "_" and "-" - FileResponse
+# encodes non-ASCII names in the header (RFC 5987)
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w -]")
+
 
 @app.get("/api/session/{session_id}/download-contract")
 async def download_contract_pdf(session_id: str):
-    # Try memory first, then database
-    if session_id in agent_sessions:
-        agent = agent_sessions[session_id]
+    # Try the session store first, then database
+    agent = await sessions.get(session_id)
+    if agent is not None:
         contract_text = agent.state.get("contract_text")
         contract_spec = agent.state.get("contract_spec", {})
     else:
@@ -238,28 +406,48 @@ async def download_contract_pdf(session_id: str):
         raise HTTPException(status_code=400, detail="No contract available")
 
     try:
-        pdf_bytes = generate_contract_pdf(contract_text, contract_spec)
-
         title = contract_spec.get("title", "contract")
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_title = safe_title.replace(' ', '_')[:50]
-        filename = f"{safe_title}.pdf"
+        safe_title = _UNSAFE_FILENAME_CHARS.sub("", title).strip().replace(' ', '_')[:50]
+        filename = f"{safe_title or 'contract'}.pdf"
 
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+        pdf_path = await asyncio.get_running_loop().run_in_executor(
+            app.state.pdf_pool, cached_pdf_path, session_id, contract_text, contract_spec
+        )
+
+        return FileResponse(
+            pdf_path,
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            filename=filename,
         )
 
     except Exception as e:
+        logger.exception("PDF download failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Summaries of recently explained contracts, keyed by a hash of the contract text
+EXPLAIN_CACHE_SIZE = 512
+_explain_cache: LRUCache = LRUCache(maxsize=EXPLAIN_CACHE_SIZE)
+
+
+async def _summarize(state: Dict[str, Any]) -> str:
+    """Explain the contract, reusing the summary if the same text was explained before."""
+    key = hashlib.blake2b(state["contract_text"].encode("utf-8"), digest_size=16).digest()
+    summary = _explain_cache.get(key)
+    if summary is None:
+        result = await explain_contract_node(state)
+        summary = result.get("summary", "")
+        # Don't pin an empty reply or the canned fallback (LLM call failed) - retry next time
+        if summary and summary != generate_fallback_summary(state.get("contract_spec") or {}):
+            _explain_cache[key] = summary
+    return summary
+
+
 @app.get("/api/session/{session_id}/explain-contract")
 async def explain_contract(session_id: str):
-    # Try memory first, then database
-    if session_id in agent_sessions:
-        agent = agent_sessions[session_id]
+    # Try the session store first, then database
+    agent = await sessions.get(session_id)
+    if agent is not None:
         state = agent.state
     else:
         # Try loading from database
@@ -278,12 +466,12 @@ async def explain_contract(session_id: str):
     if state.get("summary"):
         return {"explanation": state["summary"]}
 
-    result = await explain_contract_node(state)
-    summary = result.get("summary", "")
+    summary = await _summarize(state)
 
-    # Save summary if we have the agent in memory
-    if session_id in agent_sessions:
-        agent_sessions[session_id].state["summary"] = summary
+    # Save summary if we have a live agent for this session
+    if agent is not None:
+        agent.state["summary"] = summary
+        await sessions.save(session_id, agent)
 
     return {"explanation": summary}
 
@@ -309,9 +497,9 @@ async def get_contract(session_id: str):
 @app.delete("/api/contracts/{session_id}")
 async def delete_contract(session_id: str):
     """Delete a contract by session ID."""
-    # Also remove from memory if present
-    if session_id in agent_sessions:
-        del agent_sessions[session_id]
+    # Also drop the live agent and any cached PDFs (they carry party details)
+    await sessions.delete(session_id)
+    await asyncio.to_thread(purge_session_pdfs, session_id)
     
     deleted = delete_session(session_id)
     if not deleted:
@@ -348,21 +536,47 @@ async def generate_solidity(request: SolidityRequest):
         )
         
     except Exception as e:
-        print("[API] Solidity generation error:", e)
+        logger.exception("solidity generation failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def get_field_suggestions(field: str) -> list:
-    suggestions_map = {
-        "payment_schedule": ["50% upfront", "100% upfront", "On completion"],
-        "max_revisions": ["Unlimited", "2 revisions", "3 revisions"],
-        "dispute_method": ["Mediation", "Negotiation", "Arbitration"],
-        "late_delivery_policy": ["No penalty", "5% per day late", "3-day grace period"],
-    }
-    return suggestions_map.get(field, [])
+_SUGGESTIONS_MAP: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "payment_schedule": ("50% upfront", "100% upfront", "On completion"),
+    "max_revisions": ("Unlimited", "2 revisions", "3 revisions"),
+    "dispute_method": ("Mediation", "Negotiation", "Arbitration"),
+    "late_delivery_policy": ("No penalty", "5% per day late", "3-day grace period"),
+})
+
+
+def get_field_suggestions(field: str) -> Tuple[str, ...]:
+    # Shared immutable tuples - nothing is built per call
+    return _SUGGESTIONS_MAP.get(field, ())
+
+
+def _worker_count() -> int:
+    """
+    WEB_CONCURRENCY if set; otherwise one worker per CPU when sessions live in
+    Redis or SQLite, and a single worker with the in-memory store (which is
+    per process).
+    """
+    if "WEB_CONCURRENCY" in os.environ:
+        return int(os.environ["WEB_CONCURRENCY"])
+    if os.getenv("SESSION_BACKEND", "memory").lower() in ("redis", "sqlite"):
+        return os.cpu_count() or 1
+    return 1
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
+    # uvloop/httptools come with uvicorn[standard]; fall back to asyncio/h11 without them
+    try:
+        import uvloop  # noqa: F401
+        import httptools  # noqa: F401
+        loop, http = "uvloop", "httptools"
+    except ImportError:
+        loop, http = "asyncio", "h11"
+    # Workers are separate processes, so uvicorn needs the import string; a
+    # single worker serves this app directly instead of importing main.py again
+    workers = _worker_count()
+    target = "main:app" if workers > 1 else app
+    uvicorn.run(target, host="0.0.0.0", port=8000, workers=workers, loop=loop, http=http)
@@ -1,13 +1,21 @@
 #pibble voice
 
+import asyncio
+import base64
+import json
 import os
-import requests
-from fastapi import APIRouter
-from fastapi.responses import Response
-from pydantic import BaseModel
+import re
+from typing import List, Optional
+
+import httpx
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from pathlib import Path
 
+from app.logging_utils import get_logger
+
 # Load environment variables
 # Try loading from backend/.env first, then parent .env
 backend_dir = Path(__file__).parent
@@ -16,15 +24,81 @@ load_dotenv(dotenv_path=backend_dir.parent / ".env", override=False)
 
 router = APIRouter()
 
+logger = get_logger("tts")
+
+# HTTP/2 (needs the h2 package from httpx[http2]) multiplexes concurrent TTS
+# requests over one connection; without it we stay on pooled HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+# One shared client, so connections to ElevenLabs are pooled and kept alive.
+# Built on first use and again after close_client(), so a later lifespan in
+# the same process (e.g. a reused TestClient) gets a fresh one.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client, created if there isn't an open one."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client - called from the app's lifespan on shutdown."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
 # Load env variables
 ELEVEN_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID")
 
+# Low-latency model and a small MP3 encoding, so the first audio arrives sooner
+TTS_MODEL_ID = "eleven_turbo_v2_5"
+TTS_OUTPUT_FORMAT = "mp3_22050_32"
+VOICE_SETTINGS = {
+    "stability": 0.45,
+    "similarity_boost": 0.8
+}
+
+# Most sentence syntheses in flight at once (ElevenLabs caps concurrency per plan)
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "3"))
+_synth_slots = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+
+# Sentence end: . ! or ? (plus closing quotes/brackets) followed by whitespace,
+# so decimals like 2.5 never split
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+_ABBREVIATIONS = frozenset({
+    "dr.", "mr.", "mrs.", "ms.", "st.", "vs.", "etc.", "e.g.", "i.e.",
+    "a.m.", "p.m.", "am.", "pm.", "no.", "approx.",
+})
+
 class TTSRequest(BaseModel):
     text: str
+    # ElevenLabs latency optimization tier: 0 (best quality) .. 4 (fastest, may mispronounce numbers)
+    latency: int = Field(3, ge=0, le=4)
 
 @router.post("/tts")
-def tts(req: TTSRequest):
+async def tts(req: TTSRequest):
+    response = await _open_stream(req.text, req.latency)
+    return StreamingResponse(
+        _iter_audio(response),
+        media_type="audio/mpeg"
+    )
+
+
+async def _open_stream(text: str, latency: int) -> httpx.Response:
+    """Start a streaming synthesis request. Raises HTTPException if it fails."""
     # Check if API key and voice ID are set
     if not ELEVEN_API_KEY or not VOICE_ID:
         from fastapi import HTTPException
@@ -33,33 +107,171 @@ def tts(req: TTSRequest):
             detail="ElevenLabs API key or Voice ID not configured. Please check your .env file."
         )
     
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}"
+    # The /stream variant sends audio as it is synthesized instead of all at the end
+    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}/stream"
 
     headers = {
         "xi-api-key": ELEVEN_API_KEY,
         "Content-Type": "application/json"
     }
 
+    params = {
+        "optimize_streaming_latency": latency,
+        "output_format": TTS_OUTPUT_FORMAT,
+    }
+
     payload = {
-        "text": req.text,
-        "model_id": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.45,
-            "similarity_boost": 0.8
-        }
+        "text": text,
+        "model_id": TTS_MODEL_ID,
+        "voice_settings": VOICE_SETTINGS
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        
-        return Response(
-            content=response.content,
-            media_type="audio/mpeg"
-        )
-    except requests.exceptions.RequestException as e:
+        client = get_client()
+        request = client.build_request("POST", url, params=params, json=payload, headers=headers)
+        response = await client.send(request, stream=True)
+    except httpx.HTTPError as e:
         from fastapi import HTTPException
-        error_msg = f"ElevenLabs API error: {str(e)}"
-        if hasattr(e.response, 'text'):
-            error_msg += f" - {e.response.text}"
-        raise HTTPException(status_code=500, detail=error_msg)
+        raise HTTPException(status_code=500, detail=f"ElevenLabs API error: {str(e)}")
+
+    logger.debug("ElevenLabs responded over %s", response.http_version)
+
+    if response.is_error:
+        from fastapi import HTTPException
+        await response.aread()  # Error bodies are small; keep the text for the message
+        await response.aclose()
+        raise HTTPException(
+            status_code=500,
+            detail=f"ElevenLabs API error: {response.status_code} {response.reason_phrase} - {response.text}"
+        )
+
+    return response
+
+
+async def synthesize(text: str, latency: int = 3) -> bytes:
+    """Synthesize a short text (e.g. one sentence) and return the whole MP3."""
+    async with _synth_slots:
+        response = await _open_stream(text, latency)
+        try:
+            return await response.aread()
+        finally:
+            await response.aclose()
+
+
+@router.websocket("/tts/stream")
+async def tts_stream(ws: WebSocket):
+    """
+    Token-level TTS over ElevenLabs' stream-input websocket, so synthesis can
+    start before the full text is known. The connection stays open across
+    sentences.
+    
+    Client -> server (JSON text frames):
+        {"text": "partial text"}   more text to speak
+        {"flush": true}            synthesize whatever is buffered now
+        {"text": ""}               end of input
+    Server -> client: binary frames of MP3 audio, then {"isFinal": true}.
+    On any failure the server sends {"error": "..."} and closes with 1011.
+    """
+    await ws.accept()
+    if not ELEVEN_API_KEY or not VOICE_ID:
+        await ws.close(code=1011, reason="ElevenLabs API key or Voice ID not configured")
+        return
+
+    import websockets  # Ships with uvicorn[standard]; only needed for this endpoint
+
+    url = (
+        f"wss://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}/stream-input"
+        f"?model_id={TTS_MODEL_ID}&optimize_streaming_latency=3&output_format={TTS_OUTPUT_FORMAT}"
+    )
+    try:
+        async with websockets.connect(url) as upstream:
+            # First message opens the stream and carries settings and the key
+            await upstream.send(json.dumps({"text": " ", "voice_settings": VOICE_SETTINGS, "xi_api_key": ELEVEN_API_KEY}))
+
+            async def forward_text():
+                while True:
+                    message = json.loads(await ws.receive_text())
+                    if message.get("flush"):
+                        await upstream.send(json.dumps({"text": " ", "flush": True}))
+                        continue
+                    text = message.get("text", "")
+                    if not text:
+                        await upstream.send(json.dumps({"text": ""}))  # End of input
+                        return
+                    # ElevenLabs expects every chunk to end with a space
+                    if not text.endswith(" "):
+                        text += " "
+                    await upstream.send(json.dumps({"text": text, "try_trigger_generation": True}))
+
+            async def relay_audio():
+                async for raw in upstream:
+                    data = json.loads(raw)
+                    if data.get("audio"):
+                        await ws.send_bytes(base64.b64decode(data["audio"]))
+                    if data.get("isFinal"):
+                        await ws.send_json({"isFinal": True})
+                        return
+
+            sender = asyncio.create_task(forward_text())
+            relay = asyncio.create_task(relay_audio())
+            pending = {sender, relay}
+            try:
+                # Done when the audio relay is; an error in either task is raised here
+                while relay in pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+    except WebSocketDisconnect:
+        return  # Client went away - leaving the block closed upstream
+    except Exception as e:
+        # Bad client JSON, upstream dropped, connect failed...
+        logger.warning("TTS stream failed: %s", e)
+        try:
+            await ws.send_json({"error": str(e)})
+            await ws.close(code=1011)
+        except Exception:
+            pass  # Client already closed
+        return
+
+    try:
+        await ws.close()
+    except RuntimeError:
+        pass  # Client already closed
+
+
+async def _iter_audio(response: httpx.Response):
+    """Relay audio chunks as ElevenLabs sends them, closing the upstream response at the end."""
+    try:
+        async for chunk in response.aiter_bytes():
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+def split_sentences(text: str, min_chars: int = 10) -> List[str]:
+    """
+    Split text into sentences for piecewise synthesis. Abbreviations like
+    "Dr." don't end a sentence, and pieces shorter than min_chars are joined
+    to the next one.
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        last_word = text[start:match.start() + 1].rsplit(None, 1)[-1].lower()
+        if last_word in _ABBREVIATIONS:
+            continue
+        sentence = text[start:match.end()].strip()
+        if len(sentence) < min_chars:
+            continue
+        sentences.append(sentence)
+        start = match.end()
+    rest = text[start:].strip()
+    if rest:
+        if sentences and len(rest) < min_chars:
+            sentences[-1] += " " + rest
+        else:
+            sentences.append(rest)
+    return sentences